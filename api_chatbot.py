@@ -17,21 +17,30 @@ Endpoints:
 - GET /search - Web search langsung
 """
 
-from fastapi import FastAPI, HTTPException
+from fastapi import APIRouter, FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse, Response
 from pydantic import BaseModel
-from typing import Optional, List
+from typing import Optional, List, Union
 from contextlib import asynccontextmanager
+from cachetools import TTLCache
+import logging
 import re
 import time
 
+# Root tetap WARNING: library (httpx di AsyncGroq, urllib3) tidak menulis log tiap request.
+# INFO hanya untuk logger aplikasi sendiri
+logging.basicConfig()
+logger = logging.getLogger("glucare")
+logger.setLevel(logging.INFO)
+
 # ============================================================
 # GROQ SETUP (GRATIS!)
 # ============================================================
 GROQ_AVAILABLE = False
-Groq = None
+AsyncGroq = None
 try:
-    from groq import Groq
+    from groq import AsyncGroq
     GROQ_AVAILABLE = True
     print("✅ Groq library imported successfully")
 except ImportError as e:
@@ -50,6 +59,7 @@ try:
     BASE_DIR = Path(__file__).parent
     sys.path.insert(0, str(BASE_DIR / "diabetes_chatbot"))
     from web_search import WebSearcher, DiabetesSearchAgent
+    logging.getLogger(WebSearcher.__module__).setLevel(logging.INFO)
     WEBSEARCH_AVAILABLE = True
     print("✅ Web search module loaded")
 except Exception as e:
@@ -107,6 +117,14 @@ Panduan menjawab:
 
 PENTING: Kamu HANYA menjawab pertanyaan seputar diabetes. Jika user bertanya di luar topik diabetes, tolak dengan sopan."""
 
+# Prefix pesan yang identik byte-per-byte di setiap request, supaya prompt cache
+# di sisi provider bisa dipakai ulang. Dibuat sekali, tidak dibangun per request
+SYSTEM_MESSAGES = (
+    {"role": "system", "content": SYSTEM_PROMPT},
+)
+
+SEARCH_CONTEXT_PREFIX = "Berikut adalah informasi terbaru dari web search yang bisa kamu gunakan untuk menjawab:\n\n"
+
 # ============================================================
 # TOPIC FILTERING
 # ============================================================
@@ -135,6 +153,22 @@ DIABETES_KEYWORDS = [
     "lidah", "kuku", "deteksi", "screening", "skrining"
 ]
 
+# Keyword 1 kata dicek via set lookup per token (jalur cepat)
+_SINGLE_WORD_KEYWORDS = frozenset(k for k in DIABETES_KEYWORDS if " " not in k)
+_WORD_RE = re.compile(r"\w+")
+
+# Semua keyword digabung jadi 1 regex (longest first) supaya cukup 1x scan per pesan.
+# Tetap mencakup keyword 1 kata untuk match di dalam kata (mis. "diabetesnya")
+_DIABETES_KEYWORDS_RE = re.compile(
+    "|".join(re.escape(k) for k in sorted(DIABETES_KEYWORDS, key=len, reverse=True))
+)
+
+_DIABETES_PATTERNS = tuple(re.compile(p) for p in (
+    r"gula\s*darah", r"kadar\s*gula", r"cek\s*gula", r"tes\s*gula",
+    r"kencing\s*manis", r"sakit\s*gula", r"penyakit\s*gula",
+    r"blood\s*sugar", r"type\s*[12]", r"tipe\s*[12]",
+))
+
 OFF_TOPIC_RESPONSE = """Maaf, saya adalah Glucare - asisten AI yang khusus membahas topik seputar **diabetes mellitus**.
 
 Saya dapat membantu Anda dengan pertanyaan tentang:
@@ -147,22 +181,28 @@ Saya dapat membantu Anda dengan pertanyaan tentang:
 
 Silakan ajukan pertanyaan seputar diabetes, dan saya akan dengan senang hati membantu! 😊"""
 
+# Body response off-topic selalu sama kecuali response_time_ms -> tidak perlu validasi Pydantic
+_OFF_TOPIC_TEMPLATE = {
+    "success": True,
+    "response": OFF_TOPIC_RESPONSE,
+    "is_diabetes_related": False,
+    "websearch_used": False,
+    "sources": [],
+    "model": "llama-3.3-70b-versatile",
+}
+
 def is_diabetes_related(message: str) -> bool:
     """Check apakah pertanyaan terkait diabetes"""
     message_lower = message.lower()
-    
-    for keyword in DIABETES_KEYWORDS:
-        if keyword in message_lower:
-            return True
-    
-    patterns = [
-        r"gula\s*darah", r"kadar\s*gula", r"cek\s*gula", r"tes\s*gula",
-        r"kencing\s*manis", r"sakit\s*gula", r"penyakit\s*gula",
-        r"blood\s*sugar", r"type\s*[12]", r"tipe\s*[12]",
-    ]
-    
-    for pattern in patterns:
-        if re.search(pattern, message_lower):
+
+    if not _SINGLE_WORD_KEYWORDS.isdisjoint(_WORD_RE.findall(message_lower)):
+        return True
+
+    if _DIABETES_KEYWORDS_RE.search(message_lower):
+        return True
+
+    for pattern in _DIABETES_PATTERNS:
+        if pattern.search(message_lower):
             return True
     
     return False
@@ -174,6 +214,21 @@ def is_diabetes_related(message: str) -> bool:
 groq_client = None
 search_agent = None
 
+# ============================================================
+# RESPONSE CACHE
+# ============================================================
+
+# Pertanyaan yang sama (mis. sample questions) tidak perlu hit Groq lagi.
+# Hanya diakses dari event loop, jadi tidak perlu lock.
+# Hasil web search di-cache sendiri oleh WebSearcher.search
+chat_cache = TTLCache(maxsize=1024, ttl=3600)
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+def normalize_query(text: str) -> str:
+    """Normalisasi teks untuk cache key"""
+    return _WHITESPACE_RE.sub(" ", text.strip().lower())
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Lifespan event handler"""
@@ -189,7 +244,7 @@ async def lifespan(app: FastAPI):
     
     # Setup Groq client
     if GROQ_AVAILABLE and api_key:
-        groq_client = Groq(api_key=api_key)
+        groq_client = AsyncGroq(api_key=api_key)
         print("✅ Groq client initialized")
         print("   Model: llama-3.3-70b-versatile (GRATIS!)")
     else:
@@ -212,6 +267,10 @@ async def lifespan(app: FastAPI):
     yield
     
     print("👋 Shutting down...")
+    if groq_client is not None:
+        await groq_client.close()
+    if search_agent is not None:
+        search_agent.close()
 
 # ============================================================
 # FASTAPI APP
@@ -229,47 +288,57 @@ API untuk Chatbot AI khusus diabetes mellitus.
 - ⚡ Response super cepat
     """,
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
-# CORS - allow all origins for NestJS integration
+# CORS - default allow all origins for NestJS integration.
+# Batasi lewat env CORS_ORIGINS (dipisah koma), preflight di-cache browser 24 jam
+CORS_ORIGINS = [o.strip() for o in os.getenv("CORS_ORIGINS", "*").split(",") if o.strip()]
+
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_origins=CORS_ORIGINS,
+    allow_credentials="*" not in CORS_ORIGINS,  # wildcard + credentials tidak valid per spec CORS
+    allow_methods=["GET", "POST"],
+    allow_headers=["Content-Type", "Authorization"],
+    max_age=86400,
 )
 
+# Semua endpoint didaftarkan ke router. main.py meng-include router ini langsung
+# (1 middleware stack untuk semua service); `app` di atas untuk jalan standalone
+# (api_chatbot:app), router-nya di-include di akhir modul setelah semua endpoint terdaftar
+router = APIRouter(default_response_class=ORJSONResponse)
+
 # ============================================================
 # HELPER FUNCTIONS
 # ============================================================
 
-def chat_with_groq(message: str, search_context: str = None) -> str:
-    """Chat dengan Groq API"""
-    global groq_client, Groq
+async def chat_with_groq(message: str, search_context: str = None) -> str:
+    """Chat dengan Groq API (async, tidak memblokir event loop)"""
+    global groq_client, AsyncGroq
     
     # Try to initialize if not set
     if groq_client is None:
         api_key = os.getenv("GROQ_API_KEY")
-        print(f"🔑 Attempting Groq init. API key exists: {bool(api_key)}")
-        if api_key and GROQ_AVAILABLE and Groq is not None:
+        logger.info("🔑 Attempting Groq init. API key exists: %s", bool(api_key))
+        if api_key and GROQ_AVAILABLE and AsyncGroq is not None:
             try:
                 # Simple init without extra params
-                groq_client = Groq(api_key=api_key)
-                print("✅ Groq client initialized on-demand")
+                groq_client = AsyncGroq(api_key=api_key)
+                logger.info("✅ Groq client initialized on-demand")
             except TypeError as e:
                 # Try alternative init
-                print(f"⚠️ TypeError on Groq init: {e}, trying simpler init...")
+                logger.warning("⚠️ TypeError on Groq init: %s, trying simpler init...", e)
                 try:
                     import groq as groq_module
-                    groq_client = groq_module.Client(api_key=api_key)
-                    print("✅ Groq client initialized with alternative method")
+                    groq_client = groq_module.AsyncClient(api_key=api_key)
+                    logger.info("✅ Groq client initialized with alternative method")
                 except Exception as e2:
-                    print(f"❌ Failed to init Groq (alt): {e2}")
+                    logger.error("❌ Failed to init Groq (alt): %s", e2)
                     raise HTTPException(status_code=503, detail=f"Groq init failed: {str(e)}")
             except Exception as e:
-                print(f"❌ Failed to init Groq: {e}")
+                logger.error("❌ Failed to init Groq: %s", e)
                 raise HTTPException(status_code=503, detail=f"Groq init failed: {str(e)}")
     
     if not groq_client:
@@ -278,20 +347,18 @@ def chat_with_groq(message: str, search_context: str = None) -> str:
             detail=f"Groq API not configured. GROQ_AVAILABLE={GROQ_AVAILABLE}, API_KEY_EXISTS={os.getenv('GROQ_API_KEY') is not None}"
         )
     
-    messages = [
-        {"role": "system", "content": SYSTEM_PROMPT}
-    ]
+    messages = list(SYSTEM_MESSAGES)
     
-    # Add search context if available
+    # Add search context if available (setelah prefix tetap, supaya prefix tetap identik)
     if search_context:
         messages.append({
             "role": "system",
-            "content": f"Berikut adalah informasi terbaru dari web search yang bisa kamu gunakan untuk menjawab:\n\n{search_context}"
+            "content": SEARCH_CONTEXT_PREFIX + search_context
         })
     
     messages.append({"role": "user", "content": message})
     
-    response = groq_client.chat.completions.create(
+    response = await groq_client.chat.completions.create(
         model="llama-3.3-70b-versatile",
         messages=messages,
         max_tokens=1000,
@@ -304,7 +371,7 @@ def chat_with_groq(message: str, search_context: str = None) -> str:
 # ENDPOINTS
 # ============================================================
 
-@app.get("/")
+@router.get("/")
 async def root():
     return {
         "service": "Glucare Chatbot API",
@@ -321,7 +388,7 @@ async def root():
         }
     }
 
-@app.get("/health")
+@router.get("/health")
 async def health_check():
     return {
         "status": "healthy",
@@ -329,49 +396,45 @@ async def health_check():
         "websearch_available": search_agent is not None
     }
 
-@app.post("/chat", response_model=ChatResponse)
-async def chat(request: ChatRequest):
-    """
-    Chat dengan Glucare
-    
-    - **message**: Pertanyaan (harus terkait diabetes)
-    - **use_websearch**: Aktifkan web search untuk info terbaru
-    """
-    start_time = time.time()
+async def _handle_chat(message: str, use_websearch: bool) -> Union[ChatResponse, ORJSONResponse]:
+    """Logika inti chat, dipakai oleh /chat dan /chat/websearch"""
+    start_time = time.perf_counter()
     
     # Check topic
-    if not is_diabetes_related(request.message):
-        elapsed_ms = int((time.time() - start_time) * 1000)
-        return ChatResponse(
-            success=True,
-            response=OFF_TOPIC_RESPONSE,
-            is_diabetes_related=False,
-            websearch_used=False,
-            sources=[],
-            response_time_ms=elapsed_ms,
-            model="llama-3.3-70b-versatile"
-        )
+    if not is_diabetes_related(message):
+        elapsed_ms = int((time.perf_counter() - start_time) * 1000)
+        return ORJSONResponse({**_OFF_TOPIC_TEMPLATE, "response_time_ms": elapsed_ms})
     
     try:
-        sources = []
-        websearch_used = False
-        search_context = None
-        
-        # Web search if requested
-        if request.use_websearch and search_agent:
-            try:
-                results = search_agent.searcher.search(request.message, fetch_content=True)
-                if results:
-                    websearch_used = True
-                    sources = [{"title": r.title, "url": r.url, "source": r.source} for r in results[:3]]
-                    search_context = search_agent.searcher.format_results_for_llm(results)
-            except Exception as e:
-                print(f"⚠️ Web search error: {e}")
+        cache_key = (normalize_query(message), use_websearch)
+        cached = chat_cache.get(cache_key)
         
-        # Generate response with Groq
-        response_text = chat_with_groq(request.message, search_context)
+        if cached is not None:
+            response_text, websearch_used, sources = cached
+        else:
+            sources = []
+            websearch_used = False
+            search_context = None
+            
+            # Web search if requested
+            if use_websearch and search_agent:
+                try:
+                    results = await search_agent.search_async(message, fetch_content=True)
+                    if results:
+                        websearch_used = True
+                        sources = [{"title": r.title, "url": r.url, "source": r.source} for r in results[:3]]
+                        search_context = search_agent.searcher.format_results_for_llm(results)
+                except Exception as e:
+                    logger.warning("⚠️ Web search error: %s", e)
+            
+            # Generate response with Groq
+            response_text = await chat_with_groq(message, search_context)
+            
+            # Jangan cache jawaban tanpa web search untuk request yang minta web search
+            if websearch_used or not use_websearch:
+                chat_cache[cache_key] = (response_text, websearch_used, sources)
         
-        elapsed_ms = int((time.time() - start_time) * 1000)
+        elapsed_ms = int((time.perf_counter() - start_time) * 1000)
         
         return ChatResponse(
             success=True,
@@ -384,16 +447,25 @@ async def chat(request: ChatRequest):
         )
         
     except Exception as e:
-        elapsed_ms = int((time.time() - start_time) * 1000)
+        elapsed_ms = int((time.perf_counter() - start_time) * 1000)
         raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
 
-@app.post("/chat/websearch", response_model=ChatResponse)
+@router.post("/chat", response_model=ChatResponse)
+async def chat(request: ChatRequest):
+    """
+    Chat dengan Glucare
+    
+    - **message**: Pertanyaan (harus terkait diabetes)
+    - **use_websearch**: Aktifkan web search untuk info terbaru
+    """
+    return await _handle_chat(request.message, bool(request.use_websearch))
+
+@router.post("/chat/websearch", response_model=ChatResponse)
 async def chat_with_websearch(request: ChatRequest):
     """Chat + Web Search untuk info terbaru"""
-    request.use_websearch = True
-    return await chat(request)
+    return await _handle_chat(request.message, use_websearch=True)
 
-@app.get("/topics", response_model=TopicsResponse)
+@router.get("/topics", response_model=TopicsResponse)
 async def get_topics():
     """Daftar topik yang didukung"""
     return TopicsResponse(
@@ -418,24 +490,42 @@ async def get_topics():
         ]
     )
 
-@app.get("/search", response_model=SearchResult)
+@router.get("/search", response_model=SearchResult)
 async def search_diabetes_info(query: str):
     """Web search langsung untuk info diabetes"""
     if not search_agent:
         raise HTTPException(status_code=503, detail="Web search tidak tersedia")
     
     try:
-        results = search_agent.searcher.search(query, fetch_content=False)
-        return SearchResult(
-            query=query,
-            results=[
-                {"title": r.title, "url": r.url, "snippet": r.snippet, "source": r.source}
-                for r in results
-            ]
-        )
+        found = await search_agent.search_async(query, fetch_content=False)
+        results = [
+            {"title": r.title, "url": r.url, "snippet": r.snippet, "source": r.source}
+            for r in found
+        ]
+        
+        return SearchResult(query=query, results=results)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Search error: {str(e)}")
 
+@router.get("/search/context")
+async def search_context(query: str):
+    """Web search + konten halaman, langsung sebagai JSON bytes siap dikirim ke LLM"""
+    if not search_agent:
+        raise HTTPException(status_code=503, detail="Web search tidak tersedia")
+    
+    try:
+        found = await search_agent.search_async(query, fetch_content=True)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Search error: {str(e)}")
+    
+    # Sudah di-serialize orjson, tidak lewat encoder JSON FastAPI/Pydantic
+    return Response(
+        content=search_agent.searcher.results_to_json_bytes(found),
+        media_type="application/json"
+    )
+
+app.include_router(router)
+
 # ============================================================
 # RUN SERVER
 # ============================================================
@@ -451,7 +541,16 @@ if __name__ == "__main__":
     print("   POST /chat/websearch - Chat + web search")
     print("   GET  /topics        - Daftar topik")
     print("   GET  /search        - Web search")
+    print("   GET  /search/context - Web search + konten (JSON untuk LLM)")
     print("\n🌐 Swagger UI: http://localhost:8002/docs")
     print("=" * 60)
     
-    uvicorn.run(app, host="0.0.0.0", port=8002)
+    # Chatbot stateless (tanpa model di memori), aman dijalankan multi-worker
+    uvicorn.run(
+        "api_chatbot:app",
+        host="0.0.0.0",
+        port=8002,
+        workers=int(os.getenv("CHATBOT_WORKERS", os.cpu_count() or 1)),
+        loop="uvloop",
+        http="httptools",
+    )
@@ -12,14 +12,21 @@ Endpoints:
 import os
 os.environ['TF_CPP_MIN_LOG_LEVEL'] = '2'
 
-from fastapi import FastAPI, File, UploadFile, HTTPException
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+from fastapi import APIRouter, FastAPI, File, UploadFile, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel, Field
-from typing import Optional, List
+from fastapi.responses import ORJSONResponse
+from starlette.concurrency import run_in_threadpool
+from pydantic import BaseModel, Field, ValidationInfo, field_validator
+from typing import BinaryIO, Optional, List, Tuple, Union
 import tensorflow as tf
 import numpy as np
-from PIL import Image
+from PIL import Image, ImageOps, UnidentifiedImageError
 import io
+from bisect import bisect_left, bisect_right
+from colorsys import rgb_to_hsv
 from pathlib import Path
 from tensorflow.keras.applications.mobilenet_v3 import preprocess_input
 
@@ -29,55 +36,244 @@ from tensorflow.keras.applications.mobilenet_v3 import preprocess_input
 # Use relative path for Docker deployment
 BASE_DIR = Path(__file__).parent
 MODEL_PATH = BASE_DIR / "models" / "simple_v12_best.keras"
+# Hasil convert_tflite.py - kalau ada, dipakai menggantikan model Keras.
+# Bisa diarahkan ke varian lain (mis. *_fp16.tflite) lewat env TFLITE_MODEL_PATH
+TFLITE_MODEL_PATH = Path(os.getenv("TFLITE_MODEL_PATH", BASE_DIR / "models" / "simple_v12_best_int8.tflite"))
+# Tiap worker uvicorn memuat model sendiri -> core CPU dibagi rata antar worker
+# supaya thread TF/TFLite dari worker berbeda tidak saling berebut core
+DETECTION_WORKERS = int(os.getenv("DETECTION_WORKERS", 1))
+THREADS_PER_WORKER = max(1, (os.cpu_count() or 1) // DETECTION_WORKERS)
+# Thread untuk kernel XNNPACK (delegate default TFLite di CPU)
+TFLITE_NUM_THREADS = int(os.getenv("TFLITE_NUM_THREADS", THREADS_PER_WORKER))
 THRESHOLD = 0.60
+IMAGE_SIZE = (224, 224)  # Ukuran input model (width, height)
+
+# Statistik warna untuk validasi dihitung dari thumbnail, bukan resolusi penuh
+VALIDATION_THUMBNAIL_SIZE = (256, 256)
+
+# Foto besar dikecilkan dulu dengan reduce() (box filter integer, murah) sebelum resample
+# ke ukuran input model. 3.0 hasilnya praktis sama dengan resample penuh
+RESIZE_REDUCING_GAP = 3.0
+
+# Cek murah sebelum decode: file terlalu besar langsung ditolak (didokumentasikan di API_DOCS)
+MAX_UPLOAD_BYTES = 10 * 1024 * 1024
+
+# Batcher menggabungkan sampai MAX_BATCH_SIZE gambar. XLA compile ulang per shape, jadi di
+# jalur Keras batch di-pad ke bucket terdekat: cukup 4 kali compile saat warm up, tidak ada
+# compile saat request. TFLite tidak compile (resize tensor murah) -> warm up batch 1 saja
+BATCH_BUCKETS = (1, 2, 4, 8)
+MAX_BATCH_SIZE = BATCH_BUCKETS[-1]
+
+# Harus diset sebelum op TF pertama dijalankan. Inter-op 1: inference sudah diserialkan
+# lewat 1 thread executor, paralelisme cukup di dalam op (conv/matmul)
+tf.config.threading.set_intra_op_parallelism_threads(THREADS_PER_WORKER)
+tf.config.threading.set_inter_op_parallelism_threads(1)
 
 # Lazy load model - don't crash if model not found
 model = None
+infer = None  # Concrete function (graph) dari model, dipakai untuk inference
 
 def get_model():
-    global model
+    global model, infer
     if model is None:
+        if TFLITE_MODEL_PATH.exists():
+            print(f"🔄 Loading TFLite model from {TFLITE_MODEL_PATH}...")
+            interpreter = tf.lite.Interpreter(
+                model_path=str(TFLITE_MODEL_PATH),
+                num_threads=TFLITE_NUM_THREADS
+            )
+            interpreter.allocate_tensors()
+            model = interpreter
+            print("✅ TFLite model loaded!")
+            warmup_model()
+            return model
+        
         if not MODEL_PATH.exists():
             print(f"⚠️ Model not found at {MODEL_PATH}")
             return None
         print(f"🔄 Loading model from {MODEL_PATH}...")
-        model = tf.keras.models.load_model(MODEL_PATH)
+        loaded = tf.keras.models.load_model(MODEL_PATH)
+        
+        # Trace sekali dengan batch dinamis -> bisa dipakai untuk 1 gambar maupun batch.
+        # Dimensi gambar dibuat statis supaya graph tidak shape-polymorphic
+        input_spec = tf.TensorSpec([None, IMAGE_SIZE[1], IMAGE_SIZE[0], 3], tf.float32)
+        infer = tf.function(
+            lambda x: loaded(x, training=False),
+            jit_compile=True  # XLA: fuse conv + aktivasi jadi kernel yang lebih sedikit
+        ).get_concrete_function(input_spec)
+        model = loaded
         print("✅ Model loaded!")
+        warmup_model()
     return model
 
+def warmup_model():
+    """Inference dummy supaya kompilasi XLA / alokasi tensor tidak dibayar request pertama"""
+    batch_sizes = (1,) if isinstance(model, tf.lite.Interpreter) else BATCH_BUCKETS
+    for batch_size in batch_sizes:
+        predict_batch(np.zeros((batch_size, IMAGE_SIZE[1], IMAGE_SIZE[0], 3), dtype=np.float32))
+    print(f"🔥 Model warmed up (batch size {', '.join(map(str, batch_sizes))})")
+
+def predict_batch(batch: np.ndarray) -> np.ndarray:
+    """Probabilitas diabetes untuk batch gambar (N, 224, 224, 3) yang sudah di-preprocess"""
+    current_model = get_model()
+    if isinstance(current_model, tf.lite.Interpreter):
+        return _predict_tflite(current_model, batch)
+    
+    # Pad ke bucket supaya shape-nya selalu salah satu yang sudah di-compile saat warm up
+    n = len(batch)
+    bucket = BATCH_BUCKETS[bisect_left(BATCH_BUCKETS, n)]
+    if bucket != n:
+        batch = np.concatenate([batch, np.zeros((bucket - n, *batch.shape[1:]), dtype=batch.dtype)])
+    return infer(tf.convert_to_tensor(batch, dtype=tf.float32)).numpy()[:n, 0]
+
+def _predict_tflite(interpreter: tf.lite.Interpreter, batch: np.ndarray) -> np.ndarray:
+    input_detail = interpreter.get_input_details()[0]
+    
+    # Ukuran batch berubah-ubah, resize input tensor hanya kalau perlu
+    if tuple(input_detail["shape"]) != batch.shape:
+        interpreter.resize_tensor_input(input_detail["index"], batch.shape)
+        interpreter.allocate_tensors()
+    
+    interpreter.set_tensor(input_detail["index"], batch.astype(np.float32, copy=False))
+    interpreter.invoke()
+    output_index = interpreter.get_output_details()[0]["index"]
+    return interpreter.get_tensor(output_index)[:, 0].copy()
+
+def preprocess_image(img: Image.Image) -> np.ndarray:
+    """Resize gambar RGB ke ukuran input model, return array float32 (224, 224, 3)"""
+    # Langsung ke float32 dari buffer PIL, tanpa array uint8 perantara
+    arr = np.asarray(img.resize(IMAGE_SIZE, reducing_gap=RESIZE_REDUCING_GAP), dtype=np.float32)
+    # MobileNetV3 sudah punya layer rescaling sendiri; preprocess_input di sini pass-through
+    return preprocess_input(arr)
+
+def load_and_validate_image(
+    fp: BinaryIO, image_type: str
+) -> Tuple[bool, str, float, Optional[np.ndarray]]:
+    """Decode + validasi gambar dari file upload, return (is_valid, message, confidence, array siap model)"""
+    # Upload sudah di-spool Starlette ke SpooledTemporaryFile -> PIL baca langsung dari situ,
+    # tanpa menyalin seluruh isi file ke bytes + BytesIO dulu
+    size = fp.seek(0, io.SEEK_END)
+    if size > MAX_UPLOAD_BYTES:
+        return False, f"Ukuran file maksimal {MAX_UPLOAD_BYTES // (1024 * 1024)} MB", 0.0, None
+    fp.seek(0)
+    try:
+        # Image.open cuma membaca header: format apa pun yang dikenal PIL diterima,
+        # file kosong/bukan gambar ditolak sebelum decode
+        img = Image.open(fp)
+    except UnidentifiedImageError:
+        return False, "File bukan gambar yang didukung", 0.0, None
+    # JPEG: libjpeg langsung decode di skala 1/2, 1/4, 1/8 selama hasilnya masih >= thumbnail
+    img.draft('RGB', VALIDATION_THUMBNAIL_SIZE)
+    img = img.convert('RGB')
+    is_valid, validation_msg, validation_conf = validate_tongue_nail_image(img, image_type)
+    arr = preprocess_image(img) if is_valid else None
+    return is_valid, validation_msg, validation_conf, arr
+
 # Try to load on startup (but don't crash if not found)
 try:
     get_model()
 except Exception as e:
     print(f"⚠️ Could not load model: {e}")
 
+# ============================================================
+# INFERENCE BATCHING
+# ============================================================
+BATCH_TIMEOUT = 0.010  # detik menunggu request lain sebelum batch dijalankan
+
+# 1 thread khusus model: inference tidak memblok event loop, dan interpreter
+# TFLite (tidak thread-safe) tidak pernah dipanggil dari 2 thread sekaligus
+_infer_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="inference")
+
+class PredictionBatcher:
+    """Gabungkan gambar dari request yang datang bersamaan jadi 1 panggilan model"""
+    
+    def __init__(self, max_batch_size: int = MAX_BATCH_SIZE, timeout: float = BATCH_TIMEOUT):
+        self.max_batch_size = max_batch_size
+        self.timeout = timeout
+        self._queue = None
+        self._worker = None
+        self._loop = None
+    
+    async def predict(self, arr: np.ndarray) -> float:
+        """Prediksi 1 gambar yang sudah di-preprocess (224, 224, 3), return probabilitas"""
+        loop = asyncio.get_running_loop()
+        
+        # Worker dibuat lazily di event loop yang sedang jalan
+        if self._loop is not loop or self._worker.done():
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._worker = loop.create_task(self._run())
+        
+        future = loop.create_future()
+        await self._queue.put((arr, future))
+        return await future
+    
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            items = [await self._queue.get()]
+            deadline = loop.time() + self.timeout
+            
+            while len(items) < self.max_batch_size:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    items.append(await asyncio.wait_for(self._queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+            
+            try:
+                batch = np.stack([arr for arr, _ in items])
+                probs = await loop.run_in_executor(_infer_pool, predict_batch, batch)
+            except Exception as e:
+                for _, future in items:
+                    if not future.done():
+                        future.set_exception(e)
+            else:
+                for (_, future), prob in zip(items, probs):
+                    if not future.done():
+                        future.set_result(float(prob))
+
+batcher = PredictionBatcher()
+
 # ============================================================
 # FASTAPI APP
 # ============================================================
 app = FastAPI(
     title="Diabetes Detection API",
     description="API untuk deteksi diabetes menggunakan gambar lidah/kuku dan kuesioner",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse
 )
 
-# CORS - allow all origins for NestJS integration
+# CORS - default allow all origins for NestJS integration.
+# Batasi lewat env CORS_ORIGINS (dipisah koma), preflight di-cache browser 24 jam
+CORS_ORIGINS = [o.strip() for o in os.getenv("CORS_ORIGINS", "*").split(",") if o.strip()]
+
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_origins=CORS_ORIGINS,
+    allow_credentials="*" not in CORS_ORIGINS,  # wildcard + credentials tidak valid per spec CORS
+    allow_methods=["GET", "POST"],
+    allow_headers=["Content-Type", "Authorization"],
+    max_age=86400,
 )
 
+# Semua endpoint didaftarkan ke router. main.py meng-include router ini langsung
+# (1 middleware stack untuk semua service); `app` di atas untuk jalan standalone
+# (api_detection:app), router-nya di-include di akhir modul setelah semua endpoint terdaftar
+router = APIRouter(default_response_class=ORJSONResponse)
+
 # ============================================================
 # HEALTH CHECK ENDPOINT
 # ============================================================
-@app.get("/health")
+@router.get("/health")
 async def health_check():
     """Health check endpoint for Docker/Dokploy"""
     return {"status": "healthy", "model_loaded": get_model() is not None}
 
-@app.get("/")
+@router.get("/")
 async def root():
     """Root endpoint"""
     return {"message": "Diabetes Detection API is running", "version": "1.0.0"}
@@ -94,17 +290,22 @@ def validate_tongue_nail_image(img: Image.Image, image_type: str = "tongue") ->
         (is_valid, message, confidence)
     """
     try:
-        # Convert to RGB array
-        img_array = np.array(img.convert('RGB'))
+        # Downsample dulu - mean/std warna tidak butuh resolusi penuh foto HP
+        if img.width > VALIDATION_THUMBNAIL_SIZE[0] or img.height > VALIDATION_THUMBNAIL_SIZE[1]:
+            img = ImageOps.contain(img, VALIDATION_THUMBNAIL_SIZE, Image.BILINEAR)
         
-        # Get color statistics
-        r_mean = np.mean(img_array[:,:,0])
-        g_mean = np.mean(img_array[:,:,1])
-        b_mean = np.mean(img_array[:,:,2])
+        # Convert to RGB array (tanpa copy kalau sudah RGB)
+        if img.mode != 'RGB':
+            img = img.convert('RGB')
+        pixels = np.asarray(img).reshape(-1, 3)
         
-        r_std = np.std(img_array[:,:,0])
-        g_std = np.std(img_array[:,:,1])
-        b_std = np.std(img_array[:,:,2])
+        # Get color statistics: sum & sum of squares per channel langsung dari uint8,
+        # akumulasi int64 (eksak) tanpa array float perantara. std = sqrt(n*Σx² - (Σx)²) / n
+        n = len(pixels)
+        sums = pixels.sum(axis=0, dtype=np.int64)
+        sq_sums = np.einsum('ij,ij->j', pixels, pixels, dtype=np.int64)
+        r_mean, g_mean, b_mean = (sums / n).tolist()
+        r_std, g_std, b_std = (np.sqrt(n * sq_sums - sums * sums) / n).tolist()
         
         # Calculate color ratios
         total = r_mean + g_mean + b_mean + 1e-6
@@ -113,7 +314,6 @@ def validate_tongue_nail_image(img: Image.Image, image_type: str = "tongue") ->
         b_ratio = b_mean / total
         
         # HSV analysis for better skin/tongue detection
-        from colorsys import rgb_to_hsv
         h, s, v = rgb_to_hsv(r_mean/255, g_mean/255, b_mean/255)
         
         confidence = 0.0
@@ -238,6 +438,12 @@ class QuestionnaireNonDiabetes(BaseModel):
     kolesterol_tinggi: bool = Field(..., description="Kadar kolesterol pernah dinyatakan tinggi")
     frekuensi_olahraga: int = Field(..., description="Frekuensi olahraga: 0=tidak pernah, 1=1-2x, 2=3-4x, 3=5+x seminggu", ge=0, le=3)
     pola_makan: int = Field(..., description="Pola makan: 0=tinggi gula/karbo, 1=cukup seimbang, 2=sehat", ge=0, le=2)
+    
+    @property
+    def bmi(self) -> float:
+        """BMI (kg/m²) dari berat & tinggi (cm)"""
+        # Tanpa pow dan tanpa /100: tinggi cm bulat -> tinggi² eksak, BMI tepat 25/30 tidak meleset
+        return 10000 * self.berat_badan / (self.tinggi_badan * self.tinggi_badan)
 
 class QuestionnaireDiabetes(BaseModel):
     """Kuesioner untuk yang sudah terdiagnosis diabetes"""
@@ -261,11 +467,30 @@ class QuestionnaireResult(BaseModel):
     interpretation: str
     recommendations: List[str]
 
+class QuestionnaireBatchResult(BaseModel):
+    success: bool
+    count: int
+    scores: List[float]
+    risk_levels: List[str]
+
 class CombinedRequest(BaseModel):
     """Request untuk deteksi kombinasi"""
     is_diabetic: bool = Field(..., description="Apakah sudah terdiagnosis diabetes")
     image_score: Optional[float] = Field(None, description="Skor dari deteksi gambar (0-1)", ge=0, le=1)
-    questionnaire: dict = Field(..., description="Jawaban kuesioner")
+    questionnaire: Union[QuestionnaireDiabetes, QuestionnaireNonDiabetes] = Field(
+        ..., description="Jawaban kuesioner"
+    )
+    
+    @field_validator("questionnaire", mode="before")
+    @classmethod
+    def _parse_questionnaire(cls, value, info: ValidationInfo):
+        # Tipe kuesioner ditentukan oleh is_diabetic, jadi langsung divalidasi ke
+        # model yang tepat (sekali, di batas request) tanpa mencoba kedua model
+        if "is_diabetic" not in info.data or not isinstance(value, dict):
+            return value
+        if info.data["is_diabetic"]:
+            return QuestionnaireDiabetes.model_validate(value)
+        return QuestionnaireNonDiabetes.model_validate(value)
 
 class CombinedResult(BaseModel):
     success: bool
@@ -308,226 +533,254 @@ class FullScreeningResult(BaseModel):
 # HELPER FUNCTIONS
 # ============================================================
 
+# Batas skor antar level: [0, 0.25) tidak, [0.25, 0.50) rendah, [0.50, 0.75) sedang, >= 0.75 tinggi
+RISK_THRESHOLDS = (0.25, 0.50, 0.75)
+RISK_LEVELS = ("tidak", "rendah", "sedang", "tinggi")
+
+def get_risk_index(score: float) -> int:
+    """Index level risiko (0-3) untuk score, dipakai untuk lookup tabel per level"""
+    return bisect_right(RISK_THRESHOLDS, score)
+
 def get_risk_level(score: float) -> str:
     """Get risk level from score"""
-    if score >= 0.75:
-        return "tinggi"
-    elif score >= 0.50:
-        return "sedang"
-    elif score >= 0.25:
-        return "rendah"
-    else:
-        return "tidak"
+    return RISK_LEVELS[get_risk_index(score)]
+
+# Bobot kuesioner dalam satuan setengah poin (skor maks 12 poin = 24 setengah poin)
+NON_DIABETIC_MAX_HALF_POINTS = 24
+OLAHRAGA_HALF_POINTS = (2, 1, 0, 0)  # index = frekuensi_olahraga (0=tidak pernah ... 3=5+x)
+POLA_MAKAN_HALF_POINTS = (2, 1, 0)   # index = pola_makan (0=tinggi gula, 1=seimbang, 2=sehat)
+
+DIABETIC_MAX_HALF_POINTS = 24
+PERUBAHAN_BERAT_HALF_POINTS = (0, 1, 3, 3)      # 0=stabil, 1=naik sedikit, 2=turun drastis, 3=naik drastis
+KOLESTEROL_HALF_POINTS = (0, 1, 2)              # 0=normal, 1=sedikit tinggi, 2=tinggi
+POLA_MAKAN_DIABETIC_HALF_POINTS = (2, 1, 0)     # 0=tinggi gula, 1=terkontrol, 2=diet ketat
+
+def non_diabetic_score(
+    penglihatan_buram: bool,
+    sering_bak: bool,
+    luka_lama_sembuh: bool,
+    kesemutan: bool,
+    obesitas: bool,
+    sering_lapar: bool,
+    bmi: float,
+    riwayat_keluarga: bool,
+    tekanan_darah_tinggi: bool,
+    kolesterol_tinggi: bool,
+    frekuensi_olahraga: int,
+    pola_makan: int
+) -> float:
+    """Kernel skor risiko non-diabetic, hanya menerima nilai primitif (tanpa objek Pydantic)"""
+    # Semua bobot kelipatan 0.5 -> dihitung sebagai integer dalam satuan setengah poin
+    
+    # Gejala & obesitas: masing-masing 1 poin
+    half_points = 2 * (penglihatan_buram + sering_bak + luka_lama_sembuh + kesemutan + obesitas + sering_lapar)
+    
+    # BMI: >= 30 -> 1.5 poin, >= 25 -> 1 poin
+    half_points += 2 * (bmi >= 25) + (bmi >= 30)
+    
+    # Riwayat keluarga 1.5 poin, tekanan darah tinggi & kolesterol tinggi masing-masing 1 poin
+    half_points += 3 * riwayat_keluarga + 2 * (tekanan_darah_tinggi + kolesterol_tinggi)
+    
+    # Olahraga & pola makan via lookup table
+    half_points += OLAHRAGA_HALF_POINTS[frekuensi_olahraga] + POLA_MAKAN_HALF_POINTS[pola_makan]
+    
+    return min(half_points / NON_DIABETIC_MAX_HALF_POINTS, 1.0)
 
 def calculate_non_diabetic_score(q: QuestionnaireNonDiabetes) -> float:
     """Calculate risk score for non-diabetic questionnaire"""
-    score = 0
-    max_score = 12
-    
-    if q.penglihatan_buram:
-        score += 1
-    if q.sering_bak:
-        score += 1
-    if q.luka_lama_sembuh:
-        score += 1
-    if q.kesemutan:
-        score += 1
-    if q.obesitas:
-        score += 1
-    if q.sering_lapar:
-        score += 1
-    
-    # BMI
-    bmi = q.berat_badan / ((q.tinggi_badan / 100) ** 2)
-    if bmi >= 30:
-        score += 1.5
-    elif bmi >= 25:
-        score += 1
-    
-    if q.riwayat_keluarga:
-        score += 1.5
-    if q.tekanan_darah_tinggi:
-        score += 1
-    if q.kolesterol_tinggi:
-        score += 1
-    
-    # Olahraga (0=tidak pernah, 1=1-2x, 2=3-4x, 3=5+x)
-    if q.frekuensi_olahraga == 0:
-        score += 1
-    elif q.frekuensi_olahraga == 1:
-        score += 0.5
-    
-    # Pola makan (0=tinggi gula, 1=seimbang, 2=sehat)
-    if q.pola_makan == 0:
-        score += 1
-    elif q.pola_makan == 1:
-        score += 0.5
-    
-    return min(score / max_score, 1.0)
+    return non_diabetic_score(
+        q.penglihatan_buram, q.sering_bak, q.luka_lama_sembuh, q.kesemutan,
+        q.obesitas, q.sering_lapar, q.bmi,
+        q.riwayat_keluarga, q.tekanan_darah_tinggi, q.kolesterol_tinggi,
+        q.frekuensi_olahraga, q.pola_makan
+    )
+
+def diabetic_score(
+    peningkatan_bak: bool,
+    kesemutan: bool,
+    perubahan_berat: int,
+    gula_darah_puasa: float,
+    rutin_hba1c: bool,
+    hasil_hba1c: Optional[float],
+    tekanan_darah_sistolik: float,
+    kondisi_kolesterol: int,
+    konsumsi_obat: bool,
+    pernah_hipoglikemia: bool,
+    olahraga_rutin: bool,
+    pola_makan: int
+) -> float:
+    """Kernel skor severity diabetic, hanya menerima nilai primitif (tanpa objek Pydantic)"""
+    # Sama seperti non-diabetic: integer setengah poin, tanpa rantai if/elif
+    
+    # Gejala: masing-masing 1 poin
+    half_points = 2 * (peningkatan_bak + kesemutan)
+    half_points += PERUBAHAN_BERAT_HALF_POINTS[perubahan_berat]
+    
+    # Gula darah puasa: >= 100 -> 1, >= 130 -> 1.5, >= 180 -> 2 poin
+    half_points += 2 * (gula_darah_puasa >= 100) + (gula_darah_puasa >= 130) + (gula_darah_puasa >= 180)
+    
+    # HbA1c: >= 7 -> 1, >= 9 -> 2 poin; tidak rutin cek -> 0.5 poin
+    if rutin_hba1c:
+        if hasil_hba1c:
+            half_points += 2 * (hasil_hba1c >= 7) + 2 * (hasil_hba1c >= 9)
+    else:
+        half_points += 1
+    
+    # Tekanan darah sistolik: >= 130 -> 0.5, >= 140 -> 1 poin
+    half_points += (tekanan_darah_sistolik >= 130) + (tekanan_darah_sistolik >= 140)
+    half_points += KOLESTEROL_HALF_POINTS[kondisi_kolesterol]
+    
+    # Tidak minum obat 0.5, hipoglikemia 1, tidak olahraga rutin 1 poin
+    half_points += (not konsumsi_obat) + 2 * pernah_hipoglikemia + 2 * (not olahraga_rutin)
+    half_points += POLA_MAKAN_DIABETIC_HALF_POINTS[pola_makan]
+    
+    return min(half_points / DIABETIC_MAX_HALF_POINTS, 1.0)
 
 def calculate_diabetic_score(q: QuestionnaireDiabetes) -> float:
     """Calculate severity score for diabetic questionnaire"""
-    score = 0
-    max_score = 12
-    
-    if q.peningkatan_bak:
-        score += 1
-    if q.kesemutan:
-        score += 1
-    
-    # Perubahan berat (0=stabil, 1=naik sedikit, 2=turun drastis, 3=naik drastis)
-    if q.perubahan_berat >= 2:
-        score += 1.5
-    elif q.perubahan_berat == 1:
-        score += 0.5
-    
-    # Gula darah puasa
-    if q.gula_darah_puasa >= 180:
-        score += 2
-    elif q.gula_darah_puasa >= 130:
-        score += 1.5
-    elif q.gula_darah_puasa >= 100:
-        score += 1
-    
-    # HbA1c
-    if q.rutin_hba1c and q.hasil_hba1c:
-        if q.hasil_hba1c >= 9:
-            score += 2
-        elif q.hasil_hba1c >= 7:
-            score += 1
-    elif not q.rutin_hba1c:
-        score += 0.5
-    
-    # Tekanan darah
-    if q.tekanan_darah_sistolik >= 140:
-        score += 1
-    elif q.tekanan_darah_sistolik >= 130:
-        score += 0.5
-    
-    # Kolesterol (0=normal, 1=sedikit tinggi, 2=tinggi)
-    if q.kondisi_kolesterol == 2:
-        score += 1
-    elif q.kondisi_kolesterol == 1:
-        score += 0.5
-    
-    if not q.konsumsi_obat:
-        score += 0.5
-    if q.pernah_hipoglikemia:
-        score += 1
-    if not q.olahraga_rutin:
-        score += 1
-    
-    # Pola makan (0=tinggi gula, 1=terkontrol, 2=diet ketat)
-    if q.pola_makan == 0:
-        score += 1
-    elif q.pola_makan == 1:
-        score += 0.5
-    
-    return min(score / max_score, 1.0)
-
-def get_recommendations(score: float, is_diabetic: bool) -> List[str]:
-    """Get recommendations based on score"""
-    if is_diabetic:
-        if score >= 0.75:
-            return [
-                "Konsultasi dengan dokter/endokrinolog secepatnya",
-                "Review dosis obat/insulin",
-                "Periksa gula darah lebih sering",
-                "Evaluasi pola makan dan olahraga",
-                "Periksa komplikasi (mata, ginjal, kaki)"
-            ]
-        elif score >= 0.50:
-            return [
-                "Kontrol rutin ke dokter",
-                "Jaga pola makan rendah gula/karbo",
-                "Tingkatkan aktivitas fisik",
-                "Pantau gula darah secara teratur"
-            ]
-        elif score >= 0.25:
-            return [
-                "Lanjutkan pengobatan sesuai anjuran dokter",
-                "Pertahankan pola hidup sehat",
-                "Kontrol rutin sesuai jadwal"
-            ]
-        else:
-            return [
-                "Pertahankan pola makan sehat",
-                "Olahraga teratur",
-                "Minum obat sesuai anjuran"
-            ]
-    else:
-        if score >= 0.75:
-            return [
-                "Periksa gula darah puasa dan HbA1c segera",
-                "Konsultasi ke dokter secepatnya",
-                "Kurangi konsumsi gula dan karbohidrat",
-                "Mulai program olahraga teratur",
-                "Turunkan berat badan jika berlebih"
-            ]
-        elif score >= 0.50:
-            return [
-                "Periksa gula darah untuk skrining",
-                "Konsultasi ke dokter untuk evaluasi",
-                "Mulai pola hidup sehat",
-                "Olahraga minimal 3x seminggu"
-            ]
-        elif score >= 0.25:
-            return [
-                "Periksa gula darah rutin (1x setahun)",
-                "Jaga pola makan seimbang",
-                "Olahraga teratur"
-            ]
-        else:
-            return [
-                "Tetap jaga pola makan sehat",
-                "Olahraga teratur",
-                "Periksa kesehatan rutin tahunan"
-            ]
-
-def get_interpretation(score: float, is_diabetic: bool) -> str:
-    """Get interpretation text"""
-    if is_diabetic:
-        if score >= 0.75:
-            return "DIABETES TIDAK TERKONTROL - Kondisi diabetes kurang terkontrol dengan baik. Diperlukan tindakan segera."
-        elif score >= 0.50:
-            return "DIABETES PERLU PERHATIAN - Ada beberapa aspek yang perlu diperbaiki."
-        elif score >= 0.25:
-            return "DIABETES CUKUP TERKONTROL - Kondisi cukup baik, pertahankan!"
-        else:
-            return "DIABETES TERKONTROL BAIK - Diabetes terkontrol dengan baik."
-    else:
-        if score >= 0.75:
-            return "RISIKO SANGAT TINGGI - Risiko sangat tinggi terkena diabetes. Diperlukan tindakan segera."
-        elif score >= 0.50:
-            return "RISIKO TINGGI - Risiko tinggi terkena diabetes."
-        elif score >= 0.25:
-            return "RISIKO SEDANG - Ada beberapa faktor risiko yang perlu diperhatikan."
-        else:
-            return "RISIKO RENDAH - Risiko diabetes rendah. Pertahankan pola hidup sehat!"
+    return diabetic_score(
+        q.peningkatan_bak, q.kesemutan, q.perubahan_berat, q.gula_darah_puasa,
+        q.rutin_hba1c, q.hasil_hba1c, q.tekanan_darah_sistolik, q.kondisi_kolesterol,
+        q.konsumsi_obat, q.pernah_hipoglikemia, q.olahraga_rutin, q.pola_makan
+    )
 
 # ============================================================
-# ENDPOINTS
+# BATCH SCORING (NumPy, semua kuesioner sekaligus)
 # ============================================================
+MAX_QUESTIONNAIRE_BATCH = 10_000
 
-@app.get("/")
-async def root():
-    return {
-        "service": "Diabetes Detection API",
-        "version": "1.0.0",
-        "endpoints": {
-            "full_screening": "POST /detect/full-screening",
-            "detect_image": "POST /detect/image",
-            "detect_questionnaire_non_diabetic": "POST /detect/questionnaire/non-diabetic",
-            "detect_questionnaire_diabetic": "POST /detect/questionnaire/diabetic",
-            "detect_combined": "POST /detect/combined"
-        }
-    }
+_OLAHRAGA_HALF_POINTS_LUT = np.array(OLAHRAGA_HALF_POINTS, dtype=np.int32)
+_POLA_MAKAN_HALF_POINTS_LUT = np.array(POLA_MAKAN_HALF_POINTS, dtype=np.int32)
+_PERUBAHAN_BERAT_HALF_POINTS_LUT = np.array(PERUBAHAN_BERAT_HALF_POINTS, dtype=np.int32)
+_KOLESTEROL_HALF_POINTS_LUT = np.array(KOLESTEROL_HALF_POINTS, dtype=np.int32)
+_POLA_MAKAN_DIABETIC_HALF_POINTS_LUT = np.array(POLA_MAKAN_DIABETIC_HALF_POINTS, dtype=np.int32)
+
+def _column(items: list, field: str, dtype) -> np.ndarray:
+    """Ambil 1 field dari list kuesioner jadi array 1D (layout kolom per field)"""
+    return np.fromiter((getattr(q, field) for q in items), dtype=dtype, count=len(items))
+
+def calculate_non_diabetic_score_batch(items: List[QuestionnaireNonDiabetes]) -> np.ndarray:
+    """Versi batch calculate_non_diabetic_score, hasil identik per elemen"""
+    flag = lambda field: _column(items, field, np.int32)
+    
+    half_points = 2 * (
+        flag("penglihatan_buram") + flag("sering_bak") + flag("luka_lama_sembuh")
+        + flag("kesemutan") + flag("obesitas") + flag("sering_lapar")
+    )
+    
+    tinggi = _column(items, "tinggi_badan", np.float64)
+    bmi = 10000 * _column(items, "berat_badan", np.float64) / (tinggi * tinggi)
+    half_points += 2 * (bmi >= 25) + (bmi >= 30)
+    
+    half_points += 3 * flag("riwayat_keluarga") + 2 * (flag("tekanan_darah_tinggi") + flag("kolesterol_tinggi"))
+    half_points += _OLAHRAGA_HALF_POINTS_LUT[flag("frekuensi_olahraga")]
+    half_points += _POLA_MAKAN_HALF_POINTS_LUT[flag("pola_makan")]
+    
+    return np.minimum(half_points / NON_DIABETIC_MAX_HALF_POINTS, 1.0)
+
+def calculate_diabetic_score_batch(items: List[QuestionnaireDiabetes]) -> np.ndarray:
+    """Versi batch calculate_diabetic_score, hasil identik per elemen"""
+    flag = lambda field: _column(items, field, np.int32)
+    
+    half_points = 2 * (flag("peningkatan_bak") + flag("kesemutan"))
+    half_points += _PERUBAHAN_BERAT_HALF_POINTS_LUT[flag("perubahan_berat")]
+    
+    gula = _column(items, "gula_darah_puasa", np.float64)
+    half_points += 2 * (gula >= 100) + (gula >= 130) + (gula >= 180)
+    
+    # HbA1c kosong -> NaN, perbandingan dengan NaN selalu False (0 poin)
+    hba1c = np.fromiter(
+        (np.nan if q.hasil_hba1c is None else q.hasil_hba1c for q in items),
+        dtype=np.float64, count=len(items)
+    )
+    half_points += np.where(flag("rutin_hba1c"), 2 * (hba1c >= 7) + 2 * (hba1c >= 9), 1)
+    
+    sistolik = _column(items, "tekanan_darah_sistolik", np.float64)
+    half_points += sistolik >= 130  # bool + bool di NumPy = OR, jadi ditambah satu per satu
+    half_points += sistolik >= 140
+    
+    half_points += _KOLESTEROL_HALF_POINTS_LUT[flag("kondisi_kolesterol")]
+    half_points += 1 - flag("konsumsi_obat") + 2 * flag("pernah_hipoglikemia") + 2 * (1 - flag("olahraga_rutin"))
+    half_points += _POLA_MAKAN_DIABETIC_HALF_POINTS_LUT[flag("pola_makan")]
+    
+    return np.minimum(half_points / DIABETIC_MAX_HALF_POINTS, 1.0)
+
+def get_risk_levels(scores: np.ndarray) -> List[str]:
+    """Versi batch get_risk_level"""
+    indices = np.searchsorted(RISK_THRESHOLDS, scores, side="right")
+    return [RISK_LEVELS[i] for i in indices.tolist()]
+
+# Rekomendasi per level risiko (urutan sama dengan RISK_LEVELS), dibuat sekali saat import
+RECOMMENDATIONS_DIABETIC = (
+    (
+        "Pertahankan pola makan sehat",
+        "Olahraga teratur",
+        "Minum obat sesuai anjuran"
+    ),
+    (
+        "Lanjutkan pengobatan sesuai anjuran dokter",
+        "Pertahankan pola hidup sehat",
+        "Kontrol rutin sesuai jadwal"
+    ),
+    (
+        "Kontrol rutin ke dokter",
+        "Jaga pola makan rendah gula/karbo",
+        "Tingkatkan aktivitas fisik",
+        "Pantau gula darah secara teratur"
+    ),
+    (
+        "Konsultasi dengan dokter/endokrinolog secepatnya",
+        "Review dosis obat/insulin",
+        "Periksa gula darah lebih sering",
+        "Evaluasi pola makan dan olahraga",
+        "Periksa komplikasi (mata, ginjal, kaki)"
+    ),
+)
+RECOMMENDATIONS_NON_DIABETIC = (
+    (
+        "Tetap jaga pola makan sehat",
+        "Olahraga teratur",
+        "Periksa kesehatan rutin tahunan"
+    ),
+    (
+        "Periksa gula darah rutin (1x setahun)",
+        "Jaga pola makan seimbang",
+        "Olahraga teratur"
+    ),
+    (
+        "Periksa gula darah untuk skrining",
+        "Konsultasi ke dokter untuk evaluasi",
+        "Mulai pola hidup sehat",
+        "Olahraga minimal 3x seminggu"
+    ),
+    (
+        "Periksa gula darah puasa dan HbA1c segera",
+        "Konsultasi ke dokter secepatnya",
+        "Kurangi konsumsi gula dan karbohidrat",
+        "Mulai program olahraga teratur",
+        "Turunkan berat badan jika berlebih"
+    ),
+)
+
+# Interpretasi per level risiko (urutan sama dengan RISK_LEVELS)
+INTERPRETATIONS_DIABETIC = (
+    "DIABETES TERKONTROL BAIK - Diabetes terkontrol dengan baik.",
+    "DIABETES CUKUP TERKONTROL - Kondisi cukup baik, pertahankan!",
+    "DIABETES PERLU PERHATIAN - Ada beberapa aspek yang perlu diperbaiki.",
+    "DIABETES TIDAK TERKONTROL - Kondisi diabetes kurang terkontrol dengan baik. Diperlukan tindakan segera.",
+)
+INTERPRETATIONS_NON_DIABETIC = (
+    "RISIKO RENDAH - Risiko diabetes rendah. Pertahankan pola hidup sehat!",
+    "RISIKO SEDANG - Ada beberapa faktor risiko yang perlu diperhatikan.",
+    "RISIKO TINGGI - Risiko tinggi terkena diabetes.",
+    "RISIKO SANGAT TINGGI - Risiko sangat tinggi terkena diabetes. Diperlukan tindakan segera.",
+)
 
 # ============================================================
 # FULL SCREENING ENDPOINT (LIDAH + KUKU + KUESIONER)
 # ============================================================
 
-@app.post("/detect/full-screening", response_model=FullScreeningResult)
+@router.post("/detect/full-screening", response_model=FullScreeningResult)
 async def full_screening(
     tongue_image: UploadFile = File(..., description="Foto lidah (wajib)"),
     nail_image: UploadFile = File(..., description="Foto kuku (wajib)"),
@@ -592,46 +845,35 @@ async def full_screening(
         current_model = get_model()
         
         # ============================================================
-        # PROCESS TONGUE IMAGE
+        # PROCESS TONGUE & NAIL IMAGES
         # ============================================================
+        tongue_arr = None
+        nail_arr = None
+        
         if tongue_image and tongue_image.content_type.startswith("image/"):
-            contents = await tongue_image.read()
-            img = Image.open(io.BytesIO(contents)).convert('RGB')
-            
-            is_valid, validation_msg, _ = validate_tongue_nail_image(img, "tongue")
-            tongue_msg = validation_msg
-            
-            if is_valid and current_model is not None:
-                tongue_valid = True
-                img_resized = img.resize((224, 224))
-                arr = np.array(img_resized).astype(np.float32)
-                arr = preprocess_input(arr)
-                arr = np.expand_dims(arr, 0)
-                tongue_prob = float(current_model.predict(arr, verbose=0)[0][0])
-                images_analyzed += 1
-            elif not is_valid:
-                tongue_msg = f"Lidah: {validation_msg}"
+            is_valid, validation_msg, _, tongue_arr = await run_in_threadpool(
+                load_and_validate_image, tongue_image.file, "tongue"
+            )
+            tongue_msg = validation_msg if is_valid else f"Lidah: {validation_msg}"
         
-        # ============================================================
-        # PROCESS NAIL IMAGE
-        # ============================================================
         if nail_image and nail_image.content_type.startswith("image/"):
-            contents = await nail_image.read()
-            img = Image.open(io.BytesIO(contents)).convert('RGB')
-            
-            is_valid, validation_msg, _ = validate_tongue_nail_image(img, "nail")
-            nail_msg = validation_msg
+            is_valid, validation_msg, _, nail_arr = await run_in_threadpool(
+                load_and_validate_image, nail_image.file, "nail"
+            )
+            nail_msg = validation_msg if is_valid else f"Kuku: {validation_msg}"
+        
+        if current_model is not None:
+            # Lidah & kuku masuk batcher bersamaan -> 1 panggilan model untuk 2 gambar
+            pending = [arr for arr in (tongue_arr, nail_arr) if arr is not None]
+            probs = iter(await asyncio.gather(*(batcher.predict(arr) for arr in pending)))
             
-            if is_valid and current_model is not None:
+            if tongue_arr is not None:
+                tongue_valid = True
+                tongue_prob = next(probs)
+            if nail_arr is not None:
                 nail_valid = True
-                img_resized = img.resize((224, 224))
-                arr = np.array(img_resized).astype(np.float32)
-                arr = preprocess_input(arr)
-                arr = np.expand_dims(arr, 0)
-                nail_prob = float(current_model.predict(arr, verbose=0)[0][0])
-                images_analyzed += 1
-            elif not is_valid:
-                nail_msg = f"Kuku: {validation_msg}"
+                nail_prob = next(probs)
+            images_analyzed = len(pending)
         
         # ============================================================
         # CALCULATE IMAGE SCORE (average of valid images)
@@ -674,10 +916,11 @@ async def full_screening(
             # 100% questionnaire if no valid images
             final_score = q_score
         
-        risk_level = get_risk_level(final_score)
+        risk_index = get_risk_index(final_score)
+        risk_level = RISK_LEVELS[risk_index]
         prediction = "DIABETES" if final_score >= THRESHOLD else "NON_DIABETES"
-        interpretation = get_interpretation(final_score, is_diabetic=False)
-        recommendations = get_recommendations(final_score, is_diabetic=False)
+        interpretation = INTERPRETATIONS_NON_DIABETIC[risk_index]
+        recommendations = RECOMMENDATIONS_NON_DIABETIC[risk_index]
         
         return FullScreeningResult(
             success=True,
@@ -700,7 +943,17 @@ async def full_screening(
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
 
-@app.post("/detect/image", response_model=ImageDetectionResult)
+# Template pesan per image_type, dibuat sekali saat import
+_MSG_IMAGE_OK = {
+    "tongue": "✅ Analisis gambar lidah selesai. Probabilitas diabetes: {:.1f}%",
+    "nail": "✅ Analisis gambar kuku selesai. Probabilitas diabetes: {:.1f}%",
+}
+_MSG_INVALID_IMAGE = {
+    "tongue": "❌ Gambar tidak valid. {}. Silakan upload gambar lidah yang jelas.",
+    "nail": "❌ Gambar tidak valid. {}. Silakan upload gambar kuku yang jelas.",
+}
+
+@router.post("/detect/image", response_model=ImageDetectionResult)
 async def detect_from_image(
     file: UploadFile = File(...),
     image_type: str = "tongue"  # "tongue" atau "nail"
@@ -722,17 +975,15 @@ async def detect_from_image(
         if image_type not in ["tongue", "nail"]:
             raise HTTPException(status_code=400, detail="image_type harus 'tongue' atau 'nail'")
         
-        # Read image
-        contents = await file.read()
-        img = Image.open(io.BytesIO(contents)).convert('RGB')
-        
         # ============================================================
         # VALIDATE IMAGE - Check if it's actually a tongue/nail
         # ============================================================
-        is_valid, validation_msg, validation_conf = validate_tongue_nail_image(img, image_type)
+        # Decode + validasi + resize jalan di threadpool supaya event loop tetap bebas
+        is_valid, validation_msg, validation_conf, arr = await run_in_threadpool(
+            load_and_validate_image, file.file, image_type
+        )
         
         if not is_valid:
-            type_indo = "lidah" if image_type == "tongue" else "kuku"
             return ImageDetectionResult(
                 success=False,
                 is_valid_image=False,
@@ -741,7 +992,7 @@ async def detect_from_image(
                 probability=None,
                 prediction=None,
                 risk_level=None,
-                message=f"❌ Gambar tidak valid. {validation_msg}. Silakan upload gambar {type_indo} yang jelas."
+                message=_MSG_INVALID_IMAGE[image_type].format(validation_msg)
             )
         
         # ============================================================
@@ -752,17 +1003,11 @@ async def detect_from_image(
         if current_model is None:
             raise HTTPException(status_code=503, detail="Model belum tersedia. Silakan coba lagi nanti.")
         
-        img_resized = img.resize((224, 224))
-        arr = np.array(img_resized).astype(np.float32)
-        arr = preprocess_input(arr)
-        arr = np.expand_dims(arr, 0)
-        
-        # Predict
-        prob = float(current_model.predict(arr, verbose=0)[0][0])
+        # Predict (di-batch bersama request lain yang datang bersamaan)
+        prob = await batcher.predict(arr)
         prediction = "DIABETES" if prob >= THRESHOLD else "NON_DIABETES"
         risk_level = get_risk_level(prob)
         
-        type_indo = "lidah" if image_type == "tongue" else "kuku"
         return ImageDetectionResult(
             success=True,
             is_valid_image=True,
@@ -771,7 +1016,7 @@ async def detect_from_image(
             probability=prob,
             prediction=prediction,
             risk_level=risk_level,
-            message=f"✅ Analisis gambar {type_indo} selesai. Probabilitas diabetes: {prob*100:.1f}%"
+            message=_MSG_IMAGE_OK[image_type].format(prob * 100)
         )
         
     except HTTPException:
@@ -779,7 +1024,7 @@ async def detect_from_image(
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error processing image: {str(e)}")
 
-@app.post("/detect/questionnaire/non-diabetic", response_model=QuestionnaireResult)
+@router.post("/detect/questionnaire/non-diabetic", response_model=QuestionnaireResult)
 async def questionnaire_non_diabetic(data: QuestionnaireNonDiabetes):
     """
     Kuesioner screening untuk yang BELUM terdiagnosis diabetes
@@ -788,21 +1033,24 @@ async def questionnaire_non_diabetic(data: QuestionnaireNonDiabetes):
     """
     try:
         score = calculate_non_diabetic_score(data)
-        risk_level = get_risk_level(score)
-        interpretation = get_interpretation(score, is_diabetic=False)
-        recommendations = get_recommendations(score, is_diabetic=False)
+        risk_index = get_risk_index(score)
+        risk_level = RISK_LEVELS[risk_index]
+        interpretation = INTERPRETATIONS_NON_DIABETIC[risk_index]
+        recommendations = RECOMMENDATIONS_NON_DIABETIC[risk_index]
         
-        return QuestionnaireResult(
-            success=True,
-            score=score,
-            risk_level=risk_level,
-            interpretation=interpretation,
-            recommendations=recommendations
-        )
+        # Dict langsung ke ORJSONResponse: lewati konstruksi + validasi ulang response_model
+        # (skema QuestionnaireResult tetap dipakai untuk dokumentasi)
+        return ORJSONResponse({
+            "success": True,
+            "score": score,
+            "risk_level": risk_level,
+            "interpretation": interpretation,
+            "recommendations": recommendations
+        })
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.post("/detect/questionnaire/diabetic", response_model=QuestionnaireResult)
+@router.post("/detect/questionnaire/diabetic", response_model=QuestionnaireResult)
 async def questionnaire_diabetic(data: QuestionnaireDiabetes):
     """
     Kuesioner monitoring untuk yang SUDAH terdiagnosis diabetes
@@ -811,21 +1059,64 @@ async def questionnaire_diabetic(data: QuestionnaireDiabetes):
     """
     try:
         score = calculate_diabetic_score(data)
-        risk_level = get_risk_level(score)
-        interpretation = get_interpretation(score, is_diabetic=True)
-        recommendations = get_recommendations(score, is_diabetic=True)
+        risk_index = get_risk_index(score)
+        risk_level = RISK_LEVELS[risk_index]
+        interpretation = INTERPRETATIONS_DIABETIC[risk_index]
+        recommendations = RECOMMENDATIONS_DIABETIC[risk_index]
         
-        return QuestionnaireResult(
-            success=True,
-            score=score,
-            risk_level=risk_level,
-            interpretation=interpretation,
-            recommendations=recommendations
-        )
+        # Dict langsung ke ORJSONResponse: lewati konstruksi + validasi ulang response_model
+        # (skema QuestionnaireResult tetap dipakai untuk dokumentasi)
+        return ORJSONResponse({
+            "success": True,
+            "score": score,
+            "risk_level": risk_level,
+            "interpretation": interpretation,
+            "recommendations": recommendations
+        })
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+def _batch_result(items: list, score_batch) -> ORJSONResponse:
+    if len(items) > MAX_QUESTIONNAIRE_BATCH:
+        raise HTTPException(status_code=400, detail=f"Maksimal {MAX_QUESTIONNAIRE_BATCH} kuesioner per request")
+    scores = score_batch(items)
+    # Sama seperti endpoint satuan: ribuan skor tidak divalidasi ulang lewat QuestionnaireBatchResult
+    return ORJSONResponse({
+        "success": True,
+        "count": len(items),
+        "scores": scores.tolist(),
+        "risk_levels": get_risk_levels(scores)
+    })
+
+@router.post("/detect/questionnaire/non-diabetic/batch", response_model=QuestionnaireBatchResult)
+async def questionnaire_non_diabetic_batch(data: List[QuestionnaireNonDiabetes]):
+    """
+    Skor banyak kuesioner screening (belum diabetes) sekaligus
+    
+    Returns skor dan risk level per kuesioner, urutan sama dengan input
+    """
+    try:
+        return _batch_result(data, calculate_non_diabetic_score_batch)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.post("/detect/combined", response_model=CombinedResult)
+@router.post("/detect/questionnaire/diabetic/batch", response_model=QuestionnaireBatchResult)
+async def questionnaire_diabetic_batch(data: List[QuestionnaireDiabetes]):
+    """
+    Skor banyak kuesioner monitoring (sudah diabetes) sekaligus
+    
+    Returns severity score dan risk level per kuesioner, urutan sama dengan input
+    """
+    try:
+        return _batch_result(data, calculate_diabetic_score_batch)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/detect/combined", response_model=CombinedResult)
 async def detect_combined(data: CombinedRequest):
     """
     Deteksi kombinasi: 70% gambar + 30% kuesioner
@@ -839,11 +1130,9 @@ async def detect_combined(data: CombinedRequest):
     try:
         # Calculate questionnaire score
         if data.is_diabetic:
-            q = QuestionnaireDiabetes(**data.questionnaire)
-            q_score = calculate_diabetic_score(q)
+            q_score = calculate_diabetic_score(data.questionnaire)
         else:
-            q = QuestionnaireNonDiabetes(**data.questionnaire)
-            q_score = calculate_non_diabetic_score(q)
+            q_score = calculate_non_diabetic_score(data.questionnaire)
         
         # Calculate final score
         if data.image_score is not None:
@@ -853,9 +1142,14 @@ async def detect_combined(data: CombinedRequest):
             # 100% questionnaire if no image
             final_score = q_score
         
-        risk_level = get_risk_level(final_score)
-        interpretation = get_interpretation(final_score, data.is_diabetic)
-        recommendations = get_recommendations(final_score, data.is_diabetic)
+        risk_index = get_risk_index(final_score)
+        risk_level = RISK_LEVELS[risk_index]
+        if data.is_diabetic:
+            interpretation = INTERPRETATIONS_DIABETIC[risk_index]
+            recommendations = RECOMMENDATIONS_DIABETIC[risk_index]
+        else:
+            interpretation = INTERPRETATIONS_NON_DIABETIC[risk_index]
+            recommendations = RECOMMENDATIONS_NON_DIABETIC[risk_index]
         
         return CombinedResult(
             success=True,
@@ -869,17 +1163,7 @@ async def detect_combined(data: CombinedRequest):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-# ============================================================
-# HEALTH CHECK
-# ============================================================
-
-@app.get("/health")
-async def health_check():
-    return {
-        "status": "healthy",
-        "model_loaded": model is not None,
-        "threshold": THRESHOLD
-    }
+app.include_router(router)
 
 # ============================================================
 # RUN SERVER
@@ -897,4 +1181,14 @@ if __name__ == "__main__":
     print("   POST /detect/combined")
     print("\n🌐 Swagger UI: http://localhost:8001/docs")
     print("=" * 60)
-    uvicorn.run("api_detection:app", host="0.0.0.0", port=8001, reload=False)
+    
+    # Default 1 worker: tiap worker memuat model sendiri (memori x N)
+    uvicorn.run(
+        "api_detection:app",
+        host="0.0.0.0",
+        port=8001,
+        reload=False,
+        workers=DETECTION_WORKERS,
+        loop="uvloop",
+        http="httptools"
+    )
@@ -0,0 +1,88 @@
+"""
+⚙️ KONVERSI MODEL DETEKSI KE TFLITE INT8
+========================================
+Konversi model Keras (MobileNetV3) ke TFLite terkuantisasi int8 untuk inference CPU.
+File hasil otomatis dipakai oleh api_detection.py kalau ada di folder models/.
+
+Usage:
+    python convert_tflite.py
+        -> dynamic range quantization (bobot int8, tanpa data kalibrasi)
+    python convert_tflite.py --calibration-dir data/kalibrasi
+        -> full int8 (bobot + aktivasi), kalibrasi dari ~100 foto lidah/kuku
+    python convert_tflite.py --float16
+        -> bobot float16, akurasi praktis sama dengan float32 (kernel XNNPACK fp16)
+"""
+
+import os
+os.environ['TF_CPP_MIN_LOG_LEVEL'] = '2'
+
+import argparse
+from pathlib import Path
+
+import numpy as np
+import tensorflow as tf
+from PIL import Image
+from tensorflow.keras.applications.mobilenet_v3 import preprocess_input
+
+BASE_DIR = Path(__file__).parent
+MODEL_PATH = BASE_DIR / "models" / "simple_v12_best.keras"
+OUTPUT_PATH = BASE_DIR / "models" / "simple_v12_best_int8.tflite"
+FLOAT16_OUTPUT_PATH = BASE_DIR / "models" / "simple_v12_best_fp16.tflite"
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png"}
+
+
+def representative_dataset(calibration_dir: Path, limit: int = 100):
+    """Generator data kalibrasi, preprocessing sama persis dengan API"""
+    paths = sorted(
+        p for p in calibration_dir.iterdir() if p.suffix.lower() in IMAGE_EXTENSIONS
+    )[:limit]
+    if not paths:
+        raise SystemExit(f"❌ Tidak ada gambar di {calibration_dir}")
+
+    def generator():
+        for path in paths:
+            img = Image.open(path).convert('RGB').resize((224, 224))
+            arr = preprocess_input(np.array(img).astype(np.float32))
+            yield [arr[None, ...]]
+
+    return generator
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Konversi model deteksi ke TFLite int8")
+    parser.add_argument("--model", type=Path, default=MODEL_PATH, help="Path model .keras")
+    parser.add_argument("--output", type=Path, default=None, help="Path output .tflite")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument(
+        "--calibration-dir",
+        type=Path,
+        default=None,
+        help="Folder foto untuk kalibrasi aktivasi (full int8)"
+    )
+    mode.add_argument("--float16", action="store_true", help="Kuantisasi bobot ke float16")
+    args = parser.parse_args()
+    if args.output is None:
+        args.output = FLOAT16_OUTPUT_PATH if args.float16 else OUTPUT_PATH
+
+    print(f"🔄 Loading model from {args.model}...")
+    model = tf.keras.models.load_model(args.model)
+
+    converter = tf.lite.TFLiteConverter.from_keras_model(model)
+    converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    if args.calibration_dir:
+        # Input/output tetap float32 supaya preprocessing di API tidak berubah
+        converter.representative_dataset = representative_dataset(args.calibration_dir)
+        print("📐 Mode: full int8 (bobot + aktivasi)")
+    elif args.float16:
+        converter.target_spec.supported_types = [tf.float16]
+        print("📐 Mode: float16 (bobot fp16)")
+    else:
+        print("📐 Mode: dynamic range (bobot int8)")
+
+    tflite_model = converter.convert()
+    args.output.write_bytes(tflite_model)
+    print(f"✅ Saved {args.output} ({len(tflite_model) / 1e6:.1f} MB)")
+
+
+if __name__ == "__main__":
+    main()
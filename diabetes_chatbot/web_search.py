@@ -5,34 +5,122 @@ Mendapatkan informasi terbaru dari internet
 
 import os
 import re
+import codecs
 import time
+import asyncio
+import logging
+import threading
+import atexit
+import orjson
 import requests
-from typing import List, Dict, Optional
-from dataclasses import dataclass
-from urllib.parse import quote_plus
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from typing import Callable, List, Dict, Iterator, Optional, Tuple
+from collections import OrderedDict
+from dataclasses import dataclass, replace
+from cachetools import TTLCache
+from urllib.parse import quote_plus, urlparse
+from functools import lru_cache
+from importlib.util import find_spec
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 
 # Optional imports
-try:
+# Cuma dicek keberadaannya (find_spec tidak mengeksekusi modul). Import aslinya
+# ditunda sampai search/ekstraksi pertama, supaya cold start API tidak ikut
+# membayar import bs4/lxml/duckduckgo_search kalau tidak ada yang search
+HAS_DDGS = find_spec("duckduckgo_search") is not None
+HAS_BS4 = find_spec("bs4") is not None
+# Parser C (libxml2) jauh lebih cepat dari html.parser bawaan Python.
+# Kalau ada, ekstraksi teks langsung pakai lxml.html (tanpa tree BeautifulSoup)
+HAS_LXML = find_spec("lxml") is not None
+HTML_PARSER = "lxml" if HAS_LXML else "html.parser"
+HAS_GOOGLE = find_spec("googlesearch") is not None
+
+# Konten halaman bisa diambil kalau salah satu parser tersedia
+HAS_HTML_EXTRACTOR = HAS_LXML or HAS_BS4
+
+_CONTENT_XPATH = "//p | //article | //main"
+_BOILERPLATE_XPATH = "//script | //style | //nav | //footer | //header | //aside"
+
+
+@lru_cache(maxsize=None)
+def _ddgs_class():
     from duckduckgo_search import DDGS
-    HAS_DDGS = True
-except ImportError:
-    HAS_DDGS = False
+    return DDGS
 
-try:
-    from bs4 import BeautifulSoup
-    HAS_BS4 = True
-except ImportError:
-    HAS_BS4 = False
 
-try:
+@lru_cache(maxsize=None)
+def _google_search():
     from googlesearch import search as google_search
-    HAS_GOOGLE = True
-except ImportError:
-    HAS_GOOGLE = False
+    return google_search
+
+
+@lru_cache(maxsize=None)
+def _lxml_html():
+    from lxml import html as lxml_html
+    return lxml_html
+
+
+@lru_cache(maxsize=None)
+def _bs4_parser():
+    """(BeautifulSoup, strainer konten)"""
+    from bs4 import BeautifulSoup, SoupStrainer
+    # Hanya tag konten (+ blok navigasi yang nanti dibuang) yang dibangun jadi tree.
+    # Script/style dan markup lain di luar tag ini tidak pernah jadi objek Python
+    content_strainer = SoupStrainer(["p", "article", "main", "nav", "footer", "header", "aside"])
+    return BeautifulSoup, content_strainer
+
+
+logger = logging.getLogger(__name__)
+
+# Konten yang dipakai cuma ~2000 karakter, tidak perlu download seluruh halaman
+MAX_PAGE_BYTES = 200_000
+FETCH_CHUNK_SIZE = 16_384
+
+# Pool koneksi per host: cukup untuk semua thread fetch paralel ke host yang sama
+POOL_CONNECTIONS = 16  # jumlah host yang pool-nya disimpan
+POOL_MAXSIZE = 32      # koneksi keep-alive per host
+
+# Retry singkat untuk error sementara (503, gagal konek, rate limit) dengan backoff
+# eksponensial (jeda ~0.5s lalu 1s). Header Retry-After dihormati.
+# read=0: read timeout / putus di tengah response tidak diulang, supaya situs yang
+# hang tetap gagal dalam 1x timeout (bukan 3x timeout + backoff)
+FETCH_RETRY = Retry(
+    total=2,
+    connect=2,
+    read=0,
+    backoff_factor=0.5,
+    status_forcelist=(429, 500, 502, 503, 504),
+    allowed_methods=frozenset(["GET"]),
+    respect_retry_after_header=True,
+    raise_on_status=False  # status error terakhir tetap dilempar oleh raise_for_status()
+)
+
+# Cache validator HTTP (ETag/Last-Modified) + teks hasil ekstraksi per URL
+PAGE_CACHE_SIZE = 256
+
+# Hasil search lengkap (search engine + urutan trusted + konten) per query.
+# Level modul supaya dipakai bersama oleh semua instance WebSearcher
+SEARCH_CACHE_SIZE = 256
+SEARCH_CACHE_TTL = 1800  # detik
+_search_cache: "TTLCache[tuple, Tuple[SearchResult, ...]]" = TTLCache(maxsize=SEARCH_CACHE_SIZE, ttl=SEARCH_CACHE_TTL)
+# Hasil yang sebagian kontennya gagal/telat di-fetch cuma disimpan sebentar:
+# cukup untuk meredam request beruntun, request berikutnya mencoba fetch lagi
+SEARCH_PARTIAL_CACHE_TTL = 60  # detik
+_partial_search_cache: "TTLCache[tuple, Tuple[SearchResult, ...]]" = TTLCache(
+    maxsize=SEARCH_CACHE_SIZE, ttl=SEARCH_PARTIAL_CACHE_TTL
+)
+_search_cache_lock = threading.Lock()
+
+# Thread untuk search yang di-dedup DiabetesSearchAgent (search engine + fetch konten)
+SEARCH_DISPATCH_WORKERS = 8
 
+# Template 1 hasil search untuk konteks LLM
+_RESULT_TEMPLATE = "\n### Sumber {i}: {source}\n**Judul:** {title}\n**URL:** {url}\n**Ringkasan:** {snippet}\n"
+_CONTENT_TEMPLATE = "**Konten:**\n{content}...\n"
 
-@dataclass
+
+@dataclass(frozen=True)
 class SearchResult:
     """Hasil pencarian"""
     title: str
@@ -69,109 +157,151 @@ class WebSearcher:
             "halodoc.com",
             "kemenkes.go.id"
         ]
+        # Suffix ".domain" -> cocok untuk domain itu sendiri dan subdomain-nya saja,
+        # bukan "diabetes.org.mirror-palsu.com". Dicek 1x panggilan str.endswith
+        self._trusted_suffixes = tuple("." + t.lower().lstrip(".") for t in self.trusted_sources)
         
         self.headers = {
             "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
         }
+        
+        # Session dipakai ulang supaya koneksi (TCP + TLS) ke host yang sama di-reuse
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        adapter = HTTPAdapter(
+            pool_connections=POOL_CONNECTIONS,
+            pool_maxsize=POOL_MAXSIZE,
+            max_retries=FETCH_RETRY
+        )
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        
+        # url -> (etag, last_modified, teks konten), urutan LRU. Diakses dari banyak thread fetch
+        self._page_cache: "OrderedDict[str, Tuple[Optional[str], Optional[str], str]]" = OrderedDict()
+        self._page_cache_lock = threading.Lock()
+        
+        # Thread pool fetch dipakai bersama semua search, dibuat saat pertama dibutuhkan
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._pool_lock = threading.Lock()
+        
+        # Single-flight: url -> Future fetch yang sedang jalan, dipakai bersama oleh
+        # search lain yang butuh URL yang sama (tidak fetch 2x)
+        self._inflight: Dict[str, Future] = {}
+        self._inflight_lock = threading.Lock()
+    
+    def _get_pool(self) -> ThreadPoolExecutor:
+        """Thread pool untuk fetch halaman (I/O-bound -> worker lebih banyak dari core)"""
+        if self._pool is None:
+            with self._pool_lock:
+                if self._pool is None:
+                    self._pool = ThreadPoolExecutor(
+                        max_workers=max(8, self.max_results * 2),
+                        thread_name_prefix="websearch"
+                    )
+                    atexit.register(self._pool.shutdown, wait=False)
+        return self._pool
+    
+    def _submit_fetch(self, url: str) -> Future:
+        """Jadwalkan fetch_page_content, atau pakai Future yang sudah jalan untuk URL yang sama"""
+        with self._inflight_lock:
+            future = self._inflight.get(url)
+            if future is not None:
+                return future
+            future = self._get_pool().submit(self.fetch_page_content, url)
+            self._inflight[url] = future
+        # Di luar lock: callback langsung dipanggil di thread ini kalau fetch sudah selesai
+        future.add_done_callback(lambda f: self._forget_inflight(url, f))
+        return future
+    
+    def _forget_inflight(self, url: str, future: Future):
+        with self._inflight_lock:
+            if self._inflight.get(url) is future:
+                del self._inflight[url]
+    
+    def close(self):
+        """Tutup koneksi HTTP dan thread pool yang masih terbuka"""
+        if self._pool is not None:
+            self._pool.shutdown(wait=False)
+            self._pool = None
+        self.session.close()
     
     def search_duckduckgo(self, query: str) -> List[SearchResult]:
         """Pencarian menggunakan DuckDuckGo"""
+        return list(self._iter_duckduckgo(query))
+    
+    def _iter_duckduckgo(self, query: str) -> Iterator[SearchResult]:
+        """Yield hasil DuckDuckGo satu per satu, begitu diterima"""
         if not HAS_DDGS:
-            print("⚠️ duckduckgo-search tidak terinstall. Install dengan: pip install duckduckgo-search")
-            return []
+            logger.warning("⚠️ duckduckgo-search tidak terinstall. Install dengan: pip install duckduckgo-search")
+            return
         
-        results = []
+        count = 0
         try:
-            with DDGS() as ddgs:
+            with _ddgs_class()() as ddgs:
                 search_results = ddgs.text(
                     query,
                     max_results=self.max_results * 2  # Ambil lebih untuk filter
                 )
                 
                 for r in search_results:
-                    result = SearchResult(
+                    yield SearchResult(
                         title=r.get("title", ""),
                         url=r.get("href", ""),
                         snippet=r.get("body", ""),
                         source=self._extract_domain(r.get("href", ""))
                     )
-                    results.append(result)
                     
-                    if len(results) >= self.max_results:
+                    count += 1
+                    if count >= self.max_results:
                         break
                         
         except Exception as e:
-            print(f"❌ Error DuckDuckGo search: {e}")
-        
-        return results
+            logger.error("❌ Error DuckDuckGo search: %s", e)
     
     def search_google(self, query: str) -> List[SearchResult]:
         """Pencarian menggunakan Google (memerlukan googlesearch-python)"""
+        return list(self._iter_google(query))
+    
+    def _iter_google(self, query: str) -> Iterator[SearchResult]:
+        """Yield hasil Google satu per satu, begitu diterima"""
         if not HAS_GOOGLE:
-            print("⚠️ googlesearch-python tidak terinstall. Install dengan: pip install googlesearch-python")
-            return []
+            logger.warning("⚠️ googlesearch-python tidak terinstall. Install dengan: pip install googlesearch-python")
+            return
         
-        results = []
         try:
-            search_results = google_search(
+            search_results = _google_search()(
                 query,
                 num_results=self.max_results,
                 lang="id"
             )
             
             for url in search_results:
-                result = SearchResult(
+                yield SearchResult(
                     title="",
                     url=url,
                     snippet="",
                     source=self._extract_domain(url)
                 )
-                results.append(result)
                 
         except Exception as e:
-            print(f"❌ Error Google search: {e}")
-        
-        return results
+            logger.error("❌ Error Google search: %s", e)
     
-    def _extract_domain(self, url: str) -> str:
-        """Extract domain dari URL"""
+    @staticmethod
+    @lru_cache(maxsize=2048)
+    def _extract_domain(url: str) -> str:
+        """Extract domain dari URL (di-cache, URL yang sama sering muncul lagi)"""
         try:
-            from urllib.parse import urlparse
-            parsed = urlparse(url)
-            domain = parsed.netloc.replace("www.", "")
-            return domain
-        except:
+            return urlparse(url).netloc.removeprefix("www.")
+        except Exception:
             return url
     
     def fetch_page_content(self, url: str, max_length: int = 2000) -> Optional[str]:
         """Ambil konten dari halaman web"""
-        if not HAS_BS4:
+        if not HAS_HTML_EXTRACTOR:
             return None
         
         try:
-            response = requests.get(
-                url,
-                headers=self.headers,
-                timeout=self.timeout
-            )
-            response.raise_for_status()
-            
-            soup = BeautifulSoup(response.text, "html.parser")
-            
-            # Hapus script, style, nav, footer
-            for tag in soup(["script", "style", "nav", "footer", "header", "aside"]):
-                tag.decompose()
-            
-            # Ambil teks dari paragraf
-            paragraphs = soup.find_all(["p", "article", "main"])
-            text_content = []
-            
-            for p in paragraphs:
-                text = p.get_text(strip=True)
-                if len(text) > 50:  # Skip paragraf pendek
-                    text_content.append(text)
-            
-            content = "\n".join(text_content)
+            content = self._fetch_text(url)
             
             # Batasi panjang
             if len(content) > max_length:
@@ -180,13 +310,130 @@ class WebSearcher:
             return content
             
         except Exception as e:
-            print(f"⚠️ Error fetching {url}: {e}")
+            logger.warning("⚠️ Error fetching %s: %s", url, e)
+            return None
+    
+    def _fetch_text(self, url: str) -> str:
+        """Download halaman (conditional request kalau sudah pernah diambil) dan ekstrak teksnya"""
+        with self._page_cache_lock:
+            cached = self._page_cache.get(url)
+        
+        headers = {}
+        if cached is not None:
+            etag, last_modified, _ = cached
+            if etag:
+                headers["If-None-Match"] = etag
+            if last_modified:
+                headers["If-Modified-Since"] = last_modified
+        
+        # Stream + berhenti setelah MAX_PAGE_BYTES: sisa body tidak diunduh/didekompresi
+        with self.session.get(url, headers=headers, timeout=self.timeout, stream=True) as response:
+            if response.status_code == 304 and cached is not None:
+                # Halaman tidak berubah -> tanpa body, tanpa parsing. Ditulis ulang (bukan
+                # move_to_end): entry bisa saja sudah di-evict thread lain sejak get di atas
+                with self._page_cache_lock:
+                    self._page_cache[url] = cached
+                    self._page_cache.move_to_end(url)
+                    if len(self._page_cache) > PAGE_CACHE_SIZE:
+                        self._page_cache.popitem(last=False)
+                return cached[2]
+            
+            response.raise_for_status()
+            body = bytearray()
+            for chunk in response.iter_content(FETCH_CHUNK_SIZE):
+                body += chunk
+                if len(body) >= MAX_PAGE_BYTES:
+                    break
+            etag = response.headers.get("ETag")
+            last_modified = response.headers.get("Last-Modified")
+            encoding = self._declared_encoding(response)
+        
+        content = self._extract_text(bytes(body), encoding)
+        
+        if etag or last_modified:
+            with self._page_cache_lock:
+                self._page_cache[url] = (etag, last_modified, content)
+                self._page_cache.move_to_end(url)
+                if len(self._page_cache) > PAGE_CACHE_SIZE:
+                    self._page_cache.popitem(last=False)
+        
+        return content
+    
+    @staticmethod
+    def _declared_encoding(response: requests.Response) -> Optional[str]:
+        """Charset dari header Content-Type, None kalau tidak ada/tidak dikenal"""
+        # response.encoding saja tidak cukup: requests mengisi ISO-8859-1 untuk text/*
+        # tanpa charset, padahal di kasus itu <meta charset> halaman yang harus menang
+        if "charset" not in response.headers.get("Content-Type", "").lower():
+            return None
+        try:
+            return codecs.lookup(response.encoding).name
+        except (LookupError, TypeError):
             return None
     
+    @staticmethod
+    def _extract_text(body: bytes, encoding: Optional[str] = None) -> str:
+        """Ambil teks paragraf dari HTML mentah (encoding: charset dari header HTTP)"""
+        if HAS_LXML:
+            return WebSearcher._extract_text_lxml(body, encoding)
+        
+        # Bytes langsung ke parser: tanpa charset header, encoding dideteksi dari meta/isi
+        BeautifulSoup, content_strainer = _bs4_parser()
+        soup = BeautifulSoup(body, HTML_PARSER, parse_only=content_strainer, from_encoding=encoding)
+        
+        # Hapus script, style, nav, footer yang masih tersisa di dalam article/main
+        for tag in soup(["script", "style", "nav", "footer", "header", "aside"]):
+            tag.decompose()
+        
+        # Ambil teks dari paragraf
+        paragraphs = soup.find_all(["p", "article", "main"])
+        text_content = []
+        
+        for p in paragraphs:
+            text = p.get_text(strip=True)
+            if len(text) > 50:  # Skip paragraf pendek
+                text_content.append(text)
+        
+        return "\n".join(text_content)
+    
+    @staticmethod
+    def _extract_text_lxml(body: bytes, encoding: Optional[str] = None) -> str:
+        """Sama dengan ekstraksi BeautifulSoup, tapi traversal & ambil teks di C (libxml2)"""
+        if not body.strip():
+            return ""
+        lxml_html = _lxml_html()
+        # Tanpa encoding eksplisit libxml2 cuma melihat <meta charset> dan jatuh ke latin-1.
+        # Body yang valid UTF-8 hampir pasti memang UTF-8 (BS4 juga menebak begitu);
+        # decoder incremental supaya karakter yang terpotong di MAX_PAGE_BYTES tidak dihitung error
+        if encoding is None:
+            try:
+                codecs.getincrementaldecoder("utf-8")().decode(body, final=False)
+                encoding = "utf-8"
+            except UnicodeDecodeError:
+                pass
+        # Parser dibuat per panggilan: objek parser lxml tidak aman dipakai lintas thread
+        parser = lxml_html.HTMLParser(encoding=encoding) if encoding else None
+        doc = lxml_html.document_fromstring(body, parser=parser)
+        
+        # Hapus script, style, nav, footer (tail text milik parent tetap disimpan)
+        for tag in doc.xpath(_BOILERPLATE_XPATH):
+            tag.drop_tree()
+        
+        # Ambil teks dari paragraf, whitespace dinormalisasi jadi 1 spasi
+        text_content = []
+        for el in doc.xpath(_CONTENT_XPATH):
+            text = " ".join(el.text_content().split())
+            if len(text) > 50:  # Skip paragraf pendek
+                text_content.append(text)
+        
+        return "\n".join(text_content)
+    
     def is_trusted_source(self, url: str) -> bool:
         """Cek apakah URL dari sumber terpercaya"""
-        domain = self._extract_domain(url)
-        return any(trusted in domain for trusted in self.trusted_sources)
+        return self._is_trusted_domain(self._extract_domain(url))
+    
+    def _is_trusted_domain(self, domain: str) -> bool:
+        return ("." + domain.lower()).endswith(self._trusted_suffixes)
     
     def search(
         self, 
@@ -205,42 +452,97 @@ class WebSearcher:
         Returns:
             List hasil pencarian
         """
+        with_content = fetch_content and HAS_HTML_EXTRACTOR
+        cache_key = (
+            self.search_engine, " ".join(query.lower().split()), self.max_results,
+            with_content, prioritize_trusted, tuple(self.trusted_sources)
+        )
+        with _search_cache_lock:
+            cached = _search_cache.get(cache_key)
+            if cached is None:
+                cached = _partial_search_cache.get(cache_key)
+        if cached is not None:
+            logger.debug("♻️ Search cache hit: %s", query)
+            return list(cached)
+        
+        results = self._search_uncached(query, fetch_content, prioritize_trusted)
+        
+        # Hasil kosong (biasanya error / rate limit) tidak di-cache
+        if results:
+            complete = not with_content or all(r.content is not None for r in results)
+            with _search_cache_lock:
+                (_search_cache if complete else _partial_search_cache)[cache_key] = tuple(results)
+        return results
+    
+    @staticmethod
+    def clear_cache():
+        """Kosongkan cache hasil search"""
+        with _search_cache_lock:
+            _search_cache.clear()
+            _partial_search_cache.clear()
+    
+    def _search_uncached(
+        self,
+        query: str,
+        fetch_content: bool,
+        prioritize_trusted: bool
+    ) -> List[SearchResult]:
         # Tambahkan konteks diabetes ke query
         diabetes_query = f"diabetes {query}"
         
-        print(f"🔍 Searching: {diabetes_query}")
+        logger.info("🔍 Searching: %s", diabetes_query)
         
         # Pilih search engine
-        if self.search_engine == "duckduckgo":
-            results = self.search_duckduckgo(diabetes_query)
-        elif self.search_engine == "google":
-            results = self.search_google(diabetes_query)
+        if self.search_engine == "google":
+            engine_results = self._iter_google(diabetes_query)
         else:
-            results = self.search_duckduckgo(diabetes_query)
+            engine_results = self._iter_duckduckgo(diabetes_query)
         
-        # Prioritaskan sumber terpercaya
+        if not (fetch_content and HAS_HTML_EXTRACTOR):
+            return self._order_results(list(engine_results), prioritize_trusted)
+        
+        # Fetch konten dimulai begitu tiap hasil search diterima, tidak menunggu
+        # search engine selesai -> waktu total ~ max(search, fetch), bukan jumlahnya
+        logger.debug("📄 Fetching page contents...")
+        results, futures = [], {}
+        for r in engine_results:
+            results.append(r)
+            futures[id(r)] = self._submit_fetch(r.url)
+        
+        results = self._order_results(results, prioritize_trusted)
+        
+        # Batas waktu total untuk semua fetch: timeout requests berlaku per read,
+        # situs yang mengirim body pelan-pelan bisa jauh melewatinya. Konten fetch yang
+        # telat = None; hasilnya hanya masuk cache pendek (lihat search()), fetch-nya
+        # tetap jalan di background dan bisa dipakai ulang lewat _submit_fetch/page cache
+        deadline = time.monotonic() + self.timeout
+        
+        # SearchResult immutable (aman dibagi lewat cache) -> buat salinan berisi konten
+        with_content = []
+        for r in results:
+            try:
+                content = futures[id(r)].result(timeout=max(0.0, deadline - time.monotonic()))
+            except FutureTimeoutError:
+                logger.warning("⚠️ Timeout fetching %s", r.url)
+                content = None
+            except Exception as e:
+                logger.warning("⚠️ Error: %s", e)
+                content = None
+            with_content.append(replace(r, content=content))
+        
+        return with_content
+    
+    def _order_results(self, results: List[SearchResult], prioritize_trusted: bool) -> List[SearchResult]:
+        """Urutkan sumber terpercaya di depan (opsional), lalu potong ke max_results"""
         if prioritize_trusted:
-            trusted = [r for r in results if self.is_trusted_source(r.url)]
-            untrusted = [r for r in results if not self.is_trusted_source(r.url)]
+            # 1 pass, pakai domain yang sudah diekstrak di r.source (tanpa parse URL lagi)
+            trusted, untrusted = [], []
+            append_trusted, append_untrusted = trusted.append, untrusted.append
+            suffixes = self._trusted_suffixes
+            for r in results:
+                (append_trusted if ("." + r.source.lower()).endswith(suffixes) else append_untrusted)(r)
             results = trusted + untrusted
         
-        # Fetch content jika diminta
-        if fetch_content and HAS_BS4:
-            print("📄 Fetching page contents...")
-            with ThreadPoolExecutor(max_workers=3) as executor:
-                future_to_result = {
-                    executor.submit(self.fetch_page_content, r.url): r 
-                    for r in results[:self.max_results]
-                }
-                
-                for future in as_completed(future_to_result):
-                    result = future_to_result[future]
-                    try:
-                        content = future.result()
-                        result.content = content
-                    except Exception as e:
-                        print(f"⚠️ Error: {e}")
-        
         return results[:self.max_results]
     
     def format_results_for_llm(self, results: List[SearchResult]) -> str:
@@ -248,20 +550,95 @@ class WebSearcher:
         if not results:
             return "Tidak ditemukan hasil pencarian yang relevan."
         
-        formatted = []
+        # Semua potongan di-append ke 1 list lalu di-join sekali (tanpa entry += ...)
+        parts = []
         for i, result in enumerate(results, 1):
-            entry = f"""
-### Sumber {i}: {result.source}
-**Judul:** {result.title}
-**URL:** {result.url}
-**Ringkasan:** {result.snippet}
-"""
+            if i > 1:
+                parts.append("\n")
+            parts.append(_RESULT_TEMPLATE.format(
+                i=i, source=result.source, title=result.title, url=result.url, snippet=result.snippet
+            ))
             if result.content:
-                entry += f"**Konten:**\n{result.content[:500]}...\n"
-            
-            formatted.append(entry)
+                parts.append(_CONTENT_TEMPLATE.format(content=result.content[:500]))
+        
+        return "".join(parts)
+    
+    def results_to_json_bytes(self, results: List[SearchResult]) -> bytes:
+        """Hasil pencarian sebagai JSON bytes (orjson) untuk payload LLM / response HTTP"""
+        return orjson.dumps([
+            {
+                "source": r.source,
+                "title": r.title,
+                "url": r.url,
+                "snippet": r.snippet,
+                "content": (r.content or "")[:500]
+            }
+            for r in results
+        ])
+
+
+class AsyncSearchDispatcher:
+    """
+    Dedup request search lintas user/turn.
+    
+    Request yang datang saat search dengan key yang sama masih berjalan ikut
+    menunggu search itu (tidak memicu search baru); hasilnya dibagikan ke
+    semua Future yang menunggu. Request pertama langsung dijalankan, tanpa jeda.
+    """
+    
+    def __init__(
+        self,
+        search_fn: Callable[[str, bool], List[SearchResult]],
+        max_workers: int = SEARCH_DISPATCH_WORKERS
+    ):
+        self._search_fn = search_fn
+        self._waiters: Dict[Tuple[str, bool], List[Future]] = {}
+        self._lock = threading.Lock()
+        # Pool terpisah dari pool fetch WebSearcher: search() sendiri submit fetch ke pool itu
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="search-dispatch")
+    
+    def submit(self, query: str, fetch_content: bool = True) -> Future:
+        """Jalankan search (atau ikut search yang sedang jalan), hasil List[SearchResult] lewat Future"""
+        future: Future = Future()
+        # Langsung RUNNING: cancel dari sisi asyncio tidak bisa membatalkan Future yang
+        # dibagi, jadi set_result/set_exception nanti selalu valid
+        future.set_running_or_notify_cancel()
+        
+        key = (" ".join(query.lower().split()), fetch_content)
+        with self._lock:
+            waiters = self._waiters.get(key)
+            if waiters is not None:
+                waiters.append(future)
+                return future
+            self._waiters[key] = [future]
         
-        return "\n".join(formatted)
+        try:
+            self._executor.submit(self._dispatch, key, query, fetch_content)
+        except RuntimeError as e:  # executor sudah di-shutdown
+            self._fan_out(key, error=e)
+        return future
+    
+    def _dispatch(self, key: Tuple[str, bool], query: str, fetch_content: bool):
+        try:
+            results = self._search_fn(query, fetch_content)
+        except Exception as e:
+            self._fan_out(key, error=e)
+        else:
+            self._fan_out(key, results=results)
+    
+    def _fan_out(self, key: Tuple[str, bool], results: List[SearchResult] = None, error: Exception = None):
+        # Entry dilepas dulu: request berikutnya memicu search baru (lewat cache WebSearcher)
+        with self._lock:
+            waiters = self._waiters.pop(key)
+        for future in waiters:
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(list(results))
+    
+    def close(self):
+        """Tolak request baru; search yang sedang jalan tetap diselesaikan"""
+        self._executor.shutdown(wait=False)
 
 
 class DiabetesSearchAgent:
@@ -278,28 +655,30 @@ class DiabetesSearchAgent:
             "rekomendasi", "guideline", "panduan terbaru",
             "perkembangan", "inovasi", "teknologi"
         ]
+        # Kata tanya tentang hal spesifik/terkini juga memicu search
+        self.question_words = ["kapan", "dimana", "siapa", "berapa"]
+        
+        # Semua trigger dalam 1 regex. Sengaja tanpa \b: perilakunya tetap substring match
+        # seperti sebelumnya (mis. "dimanakah" tetap memicu search)
+        self._trigger_re = re.compile(
+            "|".join(map(re.escape, self.search_triggers + self.question_words)),
+            re.IGNORECASE
+        )
+        self._stopwords = frozenset(["apa", "bagaimana", "mengapa", "apakah", "tolong", "jelaskan"])
+        
+        # Dispatcher dibuat saat pertama dipakai (jalur sync tidak butuh pool-nya)
+        self._dispatcher: Optional[AsyncSearchDispatcher] = None
+        self._dispatcher_lock = threading.Lock()
     
     def should_search(self, query: str) -> bool:
         """Tentukan apakah query memerlukan web search"""
-        query_lower = query.lower()
-        
-        # Cek trigger words
-        for trigger in self.search_triggers:
-            if trigger in query_lower:
-                return True
-        
-        # Cek pertanyaan tentang hal spesifik/terkini
-        if any(word in query_lower for word in ["kapan", "dimana", "siapa", "berapa"]):
-            return True
-        
-        return False
+        return self._trigger_re.search(query) is not None
     
     def enhance_query(self, query: str) -> str:
         """Tingkatkan query untuk hasil yang lebih baik"""
         # Hapus kata-kata umum
-        stopwords = ["apa", "bagaimana", "mengapa", "apakah", "tolong", "jelaskan"]
         words = query.lower().split()
-        enhanced = " ".join([w for w in words if w not in stopwords])
+        enhanced = " ".join([w for w in words if w not in self._stopwords])
         
         return enhanced
     
@@ -321,23 +700,58 @@ class DiabetesSearchAgent:
         should_search = force_search or self.should_search(query)
         
         if not should_search:
-            return {
-                "searched": False,
-                "reason": "Query tidak memerlukan web search",
-                "results": [],
-                "formatted": ""
-            }
+            return self._not_searched()
         
         # Enhance query
         enhanced_query = self.enhance_query(query)
         
         # Search
-        results = self.searcher.search(
-            enhanced_query,
-            fetch_content=True,
-            prioritize_trusted=True
-        )
+        results = self._search(enhanced_query, fetch_content=True)
+        
+        return self._build_info(enhanced_query, results)
+    
+    async def search_diabetes_info_async(
+        self,
+        query: str,
+        force_search: bool = False
+    ) -> Dict:
+        """
+        Versi async search_diabetes_info untuk banyak user/turn bersamaan.
+        Request dengan enhanced query yang sama selagi search-nya masih jalan
+        hanya memicu 1 search.
+        """
+        if not (force_search or self.should_search(query)):
+            return self._not_searched()
+        
+        enhanced_query = self.enhance_query(query)
+        results = await self.search_async(enhanced_query, fetch_content=True)
         
+        return self._build_info(enhanced_query, results)
+    
+    async def search_async(self, query: str, fetch_content: bool = True) -> List[SearchResult]:
+        """searcher.search tanpa memblokir event loop, di-dedup dengan request identik yang sedang jalan"""
+        return await asyncio.wrap_future(self._get_dispatcher().submit(query, fetch_content))
+    
+    def _search(self, query: str, fetch_content: bool) -> List[SearchResult]:
+        return self.searcher.search(query, fetch_content=fetch_content, prioritize_trusted=True)
+    
+    def _get_dispatcher(self) -> AsyncSearchDispatcher:
+        if self._dispatcher is None:
+            with self._dispatcher_lock:
+                if self._dispatcher is None:
+                    self._dispatcher = AsyncSearchDispatcher(self._search)
+                    atexit.register(self._dispatcher.close)
+        return self._dispatcher
+    
+    def _not_searched(self) -> Dict:
+        return {
+            "searched": False,
+            "reason": "Query tidak memerlukan web search",
+            "results": [],
+            "formatted": ""
+        }
+    
+    def _build_info(self, enhanced_query: str, results: List[SearchResult]) -> Dict:
         # Format untuk LLM
         formatted = self.searcher.format_results_for_llm(results)
         
@@ -348,10 +762,18 @@ class DiabetesSearchAgent:
             "formatted": formatted,
             "source_count": len(results)
         }
+    
+    def close(self):
+        """Hentikan dispatcher lalu tutup WebSearcher"""
+        if self._dispatcher is not None:
+            self._dispatcher.close()
+        self.searcher.close()
 
 
 # Test
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    
     # Test searcher
     searcher = WebSearcher(max_results=3)
     
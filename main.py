@@ -8,12 +8,15 @@ Endpoints:
 - /chatbot/* - AI Chatbot diabetes
 """
 
-from fastapi import FastAPI
+import os
+import orjson
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 
 # Import routers dari masing-masing API
-from api_detection import app as detection_app
-from api_chatbot import app as chatbot_app
+from api_detection import router as detection_router
+from api_chatbot import router as chatbot_router, lifespan as chatbot_lifespan
 
 # ============================================================
 # MAIN APP
@@ -21,41 +24,60 @@ from api_chatbot import app as chatbot_app
 app = FastAPI(
     title="Glucoin AI API",
     description="API untuk deteksi diabetes dan chatbot AI",
-    version="1.0.0"
+    version="1.0.0",
+    # Startup/shutdown chatbot (Groq client + web search); model deteksi di-load lazy
+    lifespan=chatbot_lifespan,
+    default_response_class=ORJSONResponse
 )
 
-# CORS
+# CORS - sama dengan api_detection/api_chatbot: default allow all, batasi lewat env
+# CORS_ORIGINS (dipisah koma) dan/atau CORS_ORIGIN_REGEX
+# (mis. https://(?:.*\.)?glucoin\.ai). Preflight di-cache browser 24 jam
+CORS_ORIGIN_REGEX = os.getenv("CORS_ORIGIN_REGEX") or None
+# Kalau regex diisi, wildcard default tidak dipakai (kalau tidak, regex tidak ada efeknya)
+_DEFAULT_ORIGINS = "" if CORS_ORIGIN_REGEX else "*"
+CORS_ORIGINS = [o.strip() for o in os.getenv("CORS_ORIGINS", _DEFAULT_ORIGINS).split(",") if o.strip()]
+
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_origins=CORS_ORIGINS,
+    allow_origin_regex=CORS_ORIGIN_REGEX,
+    allow_credentials="*" not in CORS_ORIGINS,  # wildcard + credentials tidak valid per spec CORS
+    allow_methods=["GET", "POST"],
+    allow_headers=["Content-Type", "Authorization"],
+    max_age=86400,
 )
 
-# Mount sub-applications
-app.mount("/detection", detection_app)
-app.mount("/chatbot", chatbot_app)
+# Router langsung di app utama (bukan mount sub-app): 1 middleware stack,
+# 1 skema OpenAPI untuk semua endpoint
+app.include_router(detection_router, prefix="/detection", tags=["detection"])
+app.include_router(chatbot_router, prefix="/chatbot", tags=["chatbot"])
+
+# Body root & health tidak pernah berubah: serialize sekali saat import,
+# tiap request (termasuk liveness probe) cuma membungkus bytes ini
+_ROOT_BODY = orjson.dumps({
+    "service": "Glucoin AI API",
+    "version": "1.0.0",
+    "endpoints": {
+        "detection": "/detection - Diabetes detection API",
+        "chatbot": "/chatbot - AI Chatbot API"
+    },
+    "docs": "/docs"
+})
+_HEALTH_BODY = orjson.dumps({"status": "healthy", "services": ["detection", "chatbot"]})
 
 @app.get("/")
 async def root():
-    return {
-        "service": "Glucoin AI API",
-        "version": "1.0.0",
-        "endpoints": {
-            "detection": "/detection - Diabetes detection API",
-            "chatbot": "/chatbot - AI Chatbot API"
-        },
-        "docs": {
-            "main": "/docs",
-            "detection": "/detection/docs",
-            "chatbot": "/chatbot/docs"
-        }
-    }
+    return Response(content=_ROOT_BODY, media_type="application/json")
+
+@app.head("/", include_in_schema=False)
+async def root_head():
+    """Cek hidup murah untuk load balancer/probe (tanpa body)"""
+    return Response(media_type="application/json")
 
 @app.get("/health")
 async def health():
-    return {"status": "healthy", "services": ["detection", "chatbot"]}
+    return Response(content=_HEALTH_BODY, media_type="application/json")
 
 if __name__ == "__main__":
     import uvicorn